@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+app/IngestStatus.py
+
+Copyright (C) 2021-2023, VISUS Health IT GmbH
+This software and supporting documentation were developed by
+  VISUS Health IT GmbH
+  Gesundheitscampus-Sued 15
+  D-44801 Bochum, Germany
+  http://www.visus.com
+  mailto:info@visus.com
+
+-> see LICENCE at root of repository
+"""
+
+import cherrypy
+import json
+
+from typing import Optional
+from app.util import IngestQueue
+
+
+@cherrypy.expose
+class IngestStatus:
+    """
+    Interface to query uploads processed in the background by an ingest queue
+    """
+
+    def __init__(self, ingest: IngestQueue, max_wait: float = 60.0):
+        """
+        Constructor of class IngestStatus
+
+        :param ingest: (shared) ingest queue of all jobs
+        :param max_wait: maximum time in seconds a client can wait for an upload to finish
+        """
+
+        self.ingest = ingest
+        self.max_wait = max_wait
+
+
+    def GET(self, ticket: Optional[str] = None, wait: Optional[str] = None) -> Optional[str]:
+        """
+        Depicts every route regarding the ingest queue
+
+        Routes:     1) /                        -> statistics on ingest queue
+                    2) /<ticket id>             -> status of a queued upload
+                    3) /<ticket id>?wait=<s>    -> status of a queued upload, waits up to <s> seconds to finish
+
+        HTTP-Code:  1) 200, correct request
+                    2) 400, parameter is incorrect
+                    3) 404, ticket not found (unknown or already forgotten)
+
+        :param ticket: ticket id
+        :param wait: (optional) seconds to wait for the upload to finish
+        :return: JSON
+        """
+
+        if ticket is None or len(ticket) == 0:
+            cherrypy.response.status = 200
+            return json.dumps(self.ingest.stats())
+
+        try:
+            timeout = min(float(wait), self.max_wait) if wait is not None else 0.0
+            assert timeout >= 0.0
+        except (ValueError, AssertionError):
+            cherrypy.response.status = 400
+            return
+
+        info = self.ingest.wait(ticket, timeout) if timeout > 0.0 else self.ingest.get(ticket)
+        if info is None:
+            cherrypy.response.status = 404
+            return
+
+        cherrypy.response.status = 200
+        return json.dumps(info.json())
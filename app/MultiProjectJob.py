@@ -29,41 +29,52 @@ class MultiProjectJob:
     Interface for all multi project jobs
     """
 
-    def __init__(self, name: str, root_path: str):
+    def __init__(self, name: str, root_path: str, settings: Optional[Settings] = None):
         """
         Constructor of class SingleProjectJob
 
         :param name: job name
         :param root_path: root path of application
+        :param settings: (optional) tunable settings, defaults are used if not provided
         """
 
         self.name = name
         self.root_path = root_path
+        self.settings = settings if settings is not None else Settings()
 
         self.log = Logging(f"{self.root_path}/log/{self.name}.log")
         self.sql = app.sql.MultiProjectJob(
-            ConnectionInfo("127.0.0.1", 3306, "root", "N0t$0$3cur3D4t4b4$3P4$$w0rd", self.name)
+            ConnectionInfo(
+                "127.0.0.1", 3306, "root", "N0t$0$3cur3D4t4b4$3P4$$w0rd", self.name, pool_size=self.settings.pool_size
+            )
         )
 
-        self.branch = Branch(self.sql)
-        self.build = Build(self.sql)
-        self.job = Job(self.sql)
+        self.cache = Cache(self.settings.cache_size, self.settings.cache_ttl)
+        self.branch = Branch(self.sql, self.cache)
+        self.build = Build(self.sql, self.cache)
+        self.job = Job(self.sql, self.cache)
+        self.paths = ResultPaths(self.sql)
 
-        self.sharedlogic = SharedLogic(self.name, self.root_path, self.log, self.sql, self.branch, self.build, self.job)
+        self.sharedlogic = SharedLogic(
+            self.name, self.root_path, self.log, self.sql, self.branch, self.build, self.job, self.cache, self.paths,
+            self.settings
+        )
 
 
-    def GET(self, branch: Optional[str] = None, id: Optional[Union[str, int]] = None, *args: str):
+    def GET(self, branch: Optional[str] = None, id: Optional[Union[str, int]] = None, *args: str,
+            after: Optional[str] = None, limit: Optional[str] = None):
         """
         Depicts every route regarding a single project job to show / request information
 
         Routes:     1) /                                                -> general information on all branches
                     2) /<branch>                                        -> all information on specific branch
-                    3) /<branch>/latest                                 -> all information on latest build
-                    4) /<branch>/latest/index.html                      -> report on latest build of specific branch
-                    5) /<branch>/latest/projects/<name>/index.html      -> report on project on latest build
-                    6) /<branch>/<build id>/                            -> all information on distinct build
-                    7) /<branch>/<build id>/index.html                  -> report on distinct build of specific branch
-                    8) /<branch>/<build id>/projects/<name>/index.html  -> report on project of distinct build
+                    3) /<branch>?after=<id>&limit=<n>                   -> page of builds of specific branch
+                    4) /<branch>/latest                                 -> all information on latest build
+                    5) /<branch>/latest/index.html                      -> report on latest build of specific branch
+                    6) /<branch>/latest/projects/<name>/index.html      -> report on project on latest build
+                    7) /<branch>/<build id>/                            -> all information on distinct build
+                    8) /<branch>/<build id>/index.html                  -> report on distinct build of specific branch
+                    9) /<branch>/<build id>/projects/<name>/index.html  -> report on project of distinct build
 
         HTTP-Code:  1) 200, correct request
                     2) 400, parameter is incorrect
@@ -73,10 +84,12 @@ class MultiProjectJob:
         :param branch: encoded branch name
         :param id: "latest" or build id
         :param args: possible parameters for a specific action
+        :param after: (optional) only list builds of branch with a higher build id
+        :param limit: (optional) maximum number of builds of branch listed
         :return: JSON or HTML report
         """
 
-        return self.sharedlogic.GET(branch, id, *args)
+        return self.sharedlogic.GET(branch, id, *args, after=after, limit=limit)
 
 
     def POST(self, metadata_file: Part, zip_file: Part):
@@ -86,16 +99,19 @@ class MultiProjectJob:
         Routes:     1) /   -> uploads new build information
 
         HTTP-Code:  1) 201, correct upload
-                    2) 400, metadata / ZIP archive missing / not correct
-                    3) 409, when build already exists or unzipping fails
-                    4) 500, server error
+                    2) 202, upload queued to be processed in the background (when ingest queue is used)
+                    3) 400, metadata / ZIP archive missing / not correct
+                    4) 409, when build already exists or unzipping fails
+                    5) 500, server error
+                    6) 503, too many uploads queued (when ingest queue is used)
 
         :param metadata_file: JSON file containing metadata
         :param zip_file: ZIP archive containing build information
-        :return: None, only sets: cherrypy.response.headers["Location"] = "/<job>/<branch>/<build id>"
+        :return: None, only sets: cherrypy.response.headers["Location"] = "/<job>/<branch>/<build id>" OR
+                 JSON of ingest ticket and sets: cherrypy.response.headers["Location"] = "/ingest/<ticket id>"
         """
 
-        self.sharedlogic.POST(metadata_file, zip_file)
+        return self.sharedlogic.POST(metadata_file, zip_file)
 
 
     @cherrypy.tools.json_in()
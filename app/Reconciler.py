@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+app/Reconciler.py
+
+Copyright (C) 2021-2023, VISUS Health IT GmbH
+This software and supporting documentation were developed by
+  VISUS Health IT GmbH
+  Gesundheitscampus-Sued 15
+  D-44801 Bochum, Germany
+  http://www.visus.com
+  mailto:info@visus.com
+
+-> see LICENCE at root of repository
+"""
+
+import cherrypy
+import json
+import mariadb
+import os
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, Union
+from app.MultiProjectJob import MultiProjectJob
+from app.SingleProjectJob import SingleProjectJob
+from app.sql import ConnectionException
+from app.util import encodeBranchName
+
+
+@cherrypy.expose
+class Reconciler:
+    """
+    Interface to reconcile the data folders of all jobs with their databases: build data without build in the database
+    (orphans, e.g. left after failures or manual changes) is removed, builds in the database without data are reported
+    """
+
+    def __init__(self, jobs: list[Union[MultiProjectJob, SingleProjectJob]], workers: int = 8,
+                 min_age: float = 60 * 60):
+        """
+        Constructor of class Reconciler
+
+        :param jobs: all mounted jobs
+        :param workers: number of threads scanning branch folders / checking build data
+        :param min_age: seconds build data has to be unchanged before being an orphan (uploads might be in progress)
+        """
+
+        self.jobs = {job.name: job for job in jobs}
+        self.workers = workers
+        self.min_age = min_age
+
+
+    def GET(self, job: Optional[str] = None) -> Optional[str]:
+        """
+        Depicts the routes to report what would be reconciled without changing anything (dry run)
+
+        Routes:     1) /        -> report on all jobs
+                    2) /<job>   -> report on a job
+
+        HTTP-Code:  1) 200, correct request
+                    2) 404, job not found
+                    3) 500, database could not be read
+
+        :param job: (optional) job name
+        :return: JSON, see "reconcile"
+        """
+
+        return self._handle(job, True)
+
+
+    def POST(self, job: Optional[str] = None) -> Optional[str]:
+        """
+        Depicts the routes to remove orphaned build data
+
+        Routes:     1) /        -> reconcile all jobs
+                    2) /<job>   -> reconcile a job
+
+        HTTP-Code:  1) 200, correct request
+                    2) 404, job not found
+                    3) 500, database could not be read
+
+        :param job: (optional) job name
+        :return: JSON, see "reconcile"
+        """
+
+        return self._handle(job, False)
+
+
+    def reconcile(self, job: Union[MultiProjectJob, SingleProjectJob], dry_run: bool = True) -> dict[str, Any]:
+        """
+        Compares the builds in the database of a job with the build data in its data folder
+
+        :param job: single or multiple project job
+        :param dry_run: only report orphans, do not remove them
+        :return: {
+                    "orphans": [
+                        <build data without build in the database, relative to the data folder of the job>,
+                        ...
+                    ],
+                    "missing": [
+                        {
+                            "branch": <branch name>,
+                            "id": <build id>,
+                            "result_path": <path for jUnit results not existing>
+                        },
+                        ...
+                    ],
+                    "removed": <number of orphans moved into the trash>
+                }
+        :exception ConnectionException: when connection could not be established
+        :exception mariadb.Error: when errors with the database connection occurred
+        """
+
+        connection: Optional[mariadb.connection] = None
+
+        try:
+            connection = job.sql.connection.get()
+            builds = job.sql.builds.paths(connection)
+        finally:
+            if connection is not None:
+                connection.close()
+
+        data_path = f"{job.root_path}/data/{job.name}"
+        known = {(encodeBranchName(branch), str(id)) for branch, id, _ in builds}
+        deadline = time.time() - self.min_age
+
+        # hidden folders (e.g. trash, deduplicated objects, uploads in progress) are no branches
+        try:
+            with os.scandir(data_path) as entries:
+                branches = [
+                    entry for entry in entries if entry.is_dir(follow_symlinks=False) and not entry.name.startswith(".")
+                ]
+        except FileNotFoundError:
+            branches = []
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="Reconciler") as executor:
+            orphans = [
+                path for paths in executor.map(
+                    lambda branch: self._orphans(branch.path, branch.name, known, deadline), branches
+                ) for path in paths
+            ]
+            exists = list(executor.map(os.path.exists, [result_path for _, _, result_path in builds]))
+
+        if not dry_run and len(orphans) > 0:
+            job.sharedlogic.discard(orphans)
+
+        return {
+            "orphans": sorted(os.path.relpath(path, data_path).replace(os.sep, "/") for path in orphans),
+            "missing": [
+                {
+                    "branch": branch,
+                    "id": id,
+                    "result_path": result_path
+                } for (branch, id, result_path), found in zip(builds, exists) if not found
+            ],
+            "removed": 0 if dry_run else len(orphans)
+        }
+
+
+    def _handle(self, job: Optional[str], dry_run: bool) -> Optional[str]:
+        """
+        Reconciles one or all jobs and answers with the reports
+
+        :param job: (optional) job name
+        :param dry_run: only report orphans, do not remove them
+        :return: JSON
+        """
+
+        if job is not None and job not in self.jobs:
+            cherrypy.response.status = 404
+            return
+
+        ret: dict[str, Any] = {}
+        for name in [job] if job is not None else self.jobs.keys():
+            try:
+                ret[name] = self.reconcile(self.jobs[name], dry_run)
+            except ConnectionException as err:
+                self.jobs[name].log.error(
+                    __file__, "RECONCILE", f"Reconciling data of job {name} failed due to creating connection " +
+                    "failed with an exception", err.message
+                )
+                cherrypy.response.status = 500
+                return
+            except mariadb.Error as err:
+                self.jobs[name].log.error(
+                    __file__, "RECONCILE", f"Reconciling data of job {name} failed due to reading SQL from table " +
+                    "Builds failed with an exception", err
+                )
+                cherrypy.response.status = 500
+                return
+
+            if ret[name]["removed"] > 0:
+                self.jobs[name].log.info(
+                    __file__, "RECONCILE", f"Successfully removed {ret[name]['removed']} orphaned builds for job " +
+                    f"{name}!"
+                )
+
+        cherrypy.response.status = 200
+        return json.dumps(ret[job] if job is not None else ret)
+
+
+    def _orphans(self, branch_path: str, branch: str, known: set[tuple[str, str]], deadline: float) -> list[str]:
+        """
+        Returns the build data of a branch folder without build in the database
+
+        :param branch_path: path of the branch folder
+        :param branch: encoded branch name
+        :param known: {(<encoded branch name>, <build id>), ...} of all builds in the database
+        :param deadline: build data changed after this point in time is skipped
+        :return: paths of build folders / ZIP archives
+        """
+
+        ret = []
+
+        try:
+            with os.scandir(branch_path) as entries:
+                for entry in entries:
+                    id = entry.name[:-len(".zip")] if entry.name.endswith(".zip") else entry.name
+                    if not id.isdigit() or (branch, str(int(id))) in known:
+                        continue
+
+                    try:
+                        if entry.stat(follow_symlinks=False).st_mtime > deadline:
+                            continue
+                    except OSError:
+                        continue
+
+                    ret.append(entry.path)
+        except OSError:
+            return []
+
+        return ret
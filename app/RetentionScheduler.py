@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+app/RetentionScheduler.py
+
+Copyright (C) 2021-2023, VISUS Health IT GmbH
+This software and supporting documentation were developed by
+  VISUS Health IT GmbH
+  Gesundheitscampus-Sued 15
+  D-44801 Bochum, Germany
+  http://www.visus.com
+  mailto:info@visus.com
+
+-> see LICENCE at root of repository
+"""
+
+import cherrypy
+import mariadb
+import threading
+
+from typing import Any, Optional, Union
+from app.MultiProjectJob import MultiProjectJob
+from app.SingleProjectJob import SingleProjectJob
+from app.sql import ConnectionException
+
+
+class RetentionScheduler:
+    """
+    Deletes old builds of all jobs regularly according to their retention policy (see "Settings.retention") and their
+    quotas (see "Settings.quota" and a global quota of all jobs) in the background, directly using the database and the
+    trash instead of the REST API
+
+    Functions:  1) start        -> start the scheduler thread
+                2) stop         -> stop the scheduler thread
+                3) run          -> apply the retention policies and quotas of all jobs once
+    """
+
+    def __init__(self, jobs: list[Union[MultiProjectJob, SingleProjectJob]], interval: float = 60 * 60,
+                 quota: Optional[int] = None):
+        """
+        Constructor of class RetentionScheduler
+
+        :param jobs: all mounted jobs
+        :param interval: seconds between two runs, the first run is right after starting
+        :param quota: (optional) bytes of build data kept of all jobs together
+        """
+
+        self.jobs = jobs
+        self.interval = interval
+        self.quota = quota
+
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+
+    def start(self):
+        """
+        Starts the scheduler thread (when not already running)
+        """
+
+        if self.thread is not None:
+            return
+
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._schedule, name="RetentionScheduler", daemon=True)
+        self.thread.start()
+
+
+    def stop(self):
+        """
+        Stops the scheduler thread, a run in progress finishes the current branch before
+        """
+
+        if self.thread is None:
+            return
+
+        self.stopped.set()
+        self.thread.join()
+        self.thread = None
+
+
+    def run(self):
+        """
+        Applies the retention policies and afterwards the quotas of all jobs once
+        """
+
+        for job in self.jobs:
+            if self.stopped.is_set():
+                return
+
+            if job.settings.retention is None:
+                continue
+
+            try:
+                self._apply(job)
+            except Exception as err:
+                self._failed([job], f"Applying retention policy for job {job.name} failed due to an unforeseen " +
+                             "exception", err)
+
+        for job in self.jobs:
+            if job.settings.quota is None:
+                continue
+
+            try:
+                self._enforce([job], job.settings.quota)
+            except Exception as err:
+                self._failed([job], f"Enforcing quota of job {job.name} failed due to an unforeseen exception", err)
+
+        if self.quota is not None:
+            try:
+                self._enforce(self.jobs, self.quota)
+            except Exception as err:
+                self._failed(self.jobs, "Enforcing quota of all jobs failed due to an unforeseen exception", err)
+
+
+    def _schedule(self):
+        """
+        Applies the retention policies every interval until stopped
+        """
+
+        while not self.stopped.is_set():
+            # the thread has to keep running, otherwise no builds are deleted anymore until restarting
+            try:
+                self.run()
+            except Exception:
+                cherrypy.log(
+                    "Applying retention policies / quotas failed with an exception", "RETENTION", traceback=True
+                )
+
+            self.stopped.wait(self.interval)
+
+
+    def _apply(self, job: Union[MultiProjectJob, SingleProjectJob]):
+        """
+        Applies the retention policy of a job to all of its branches
+
+        :param job: single or multiple project job
+        """
+
+        connection: Optional[mariadb.connection] = None
+
+        try:
+            connection = job.sql.connection.get()
+            branches = job.sql.builds.ranges(connection)
+        except ConnectionException as err:
+            job.log.error(
+                __file__, "RETENTION", f"Applying retention policy for job {job.name} failed due to creating " +
+                "connection failed with an exception", err.message
+            )
+            return
+        except mariadb.Error as err:
+            job.log.error(
+                __file__, "RETENTION", f"Applying retention policy for job {job.name} failed due to reading SQL " +
+                "from table Builds failed with an exception", err
+            )
+            return
+        finally:
+            if connection is not None:
+                connection.close()
+
+        for branch in branches or []:
+            if self.stopped.is_set():
+                return
+
+            policy = job.settings.retention.get(branch["name"])
+            if policy.keep is None and policy.max_days is None:
+                continue
+
+            self._prune(
+                job, branch["name"], f"keep {policy.keep}, max. {policy.max_days} days", keep=policy.keep,
+                max_days=policy.max_days
+            )
+
+
+    def _enforce(self, jobs: list[Union[MultiProjectJob, SingleProjectJob]], quota: int):
+        """
+        Deletes the oldest builds (of all branches) of jobs until the bytes used by them are within a quota, the latest
+        build of a branch is always kept. Uses the usage index of the jobs, brought in line with their data before.
+
+        :param jobs: single or multiple project jobs sharing the quota
+        :param quota: bytes of build data kept
+        """
+
+        for job in jobs:
+            job.sharedlogic.usage.scan()
+
+        used = sum(job.sharedlogic.usage.total() for job in jobs)
+        if used <= quota:
+            return
+
+        # (<time added>, <job>, <branch name>, <build id>, <bytes>) of all builds except the latest of every branch
+        candidates = []
+        for job in jobs:
+            builds = job.sharedlogic.usage.builds()
+
+            latest: dict[str, int] = {}
+            for branch, id, _, _ in builds:
+                latest[branch] = max(latest.get(branch, id), id)
+
+            candidates += [(added, job, branch, id, size) for branch, id, size, added in builds if id != latest[branch]]
+
+        # build ids are ascending in time, so deleting all builds of a branch up to the newest evicted one is enough
+        evicted: dict[tuple[str, str], tuple[Union[MultiProjectJob, SingleProjectJob], int]] = {}
+        for added, job, branch, id, size in sorted(candidates, key=lambda candidate: (candidate[0], candidate[3])):
+            if used <= quota:
+                break
+
+            evicted[(job.name, branch)] = (job, max(evicted.get((job.name, branch), (job, id))[1], id))
+            used -= size
+
+        for (_, branch), (job, id) in evicted.items():
+            if self.stopped.is_set():
+                return
+
+            self._prune(job, branch, f"quota of {quota} bytes", before=id + 1)
+
+
+    def _prune(self, job: Union[MultiProjectJob, SingleProjectJob], branch: str, reason: str, **kwargs: Any):
+        """
+        Deletes old builds of a branch and logs the result
+
+        :param job: single or multiple project job
+        :param branch: branch name
+        :param reason: why builds are deleted, used when logging
+        :param kwargs: see "SharedLogic.prune"
+        """
+
+        try:
+            builds = job.sharedlogic.prune(branch, **kwargs)
+        except ConnectionException as err:
+            job.log.error(
+                __file__, "RETENTION", f"Deleting old builds ({reason}) for branch {branch} for job {job.name} " +
+                "failed due to creating connection failed with an exception", err.message
+            )
+            return
+        except mariadb.Error as err:
+            job.log.error(
+                __file__, "RETENTION", f"Deleting old builds ({reason}) for branch {branch} for job {job.name} " +
+                "failed due to writing SQL failed with an exception", err
+            )
+            return
+        except Exception as err:
+            self._failed([job], f"Deleting old builds ({reason}) for branch {branch} for job {job.name} failed due " +
+                         "to an unforeseen exception", err)
+            return
+
+        if len(builds) > 0:
+            job.log.info(
+                __file__, "RETENTION", f"Successfully deleted {len(builds)} old builds ({reason}) for branch " +
+                f"{branch} for job {job.name}!"
+            )
+
+
+    def _failed(self, jobs: list[Union[MultiProjectJob, SingleProjectJob]], message: str, err: Exception):
+        """
+        Logs an unforeseen exception to the logs of the jobs and with its traceback to the error log of CherryPy, must
+        be called while handling the exception
+
+        :param jobs: single or multiple project jobs affected
+        :param message: message to log
+        :param err: exception
+        """
+
+        for job in jobs:
+            job.log.error(__file__, "RETENTION", message, err)
+
+        cherrypy.log(message, "RETENTION", traceback=True)
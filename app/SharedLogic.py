@@ -16,13 +16,18 @@ This software and supporting documentation were developed by
 """
 
 import cherrypy
+import threading
+import time
+import uuid
 
 import app.sql.MultiProjectJob
 import app.sql.SingleProjectJob
 
 from app.data.Branch import *
 from app.data.Build import *
+from app.data.Cache import *
 from app.data.Job import *
+from app.data.ResultPaths import *
 from app.util import *
 
 
@@ -32,7 +37,8 @@ class SharedLogic:
     """
 
     def __init__(self, name: str, root_path: str, log: Logging,
-                 sql: Union[app.sql.SingleProjectJob, app.sql.MultiProjectJob], branch: Branch, build: Build, job: Job):
+                 sql: Union[app.sql.SingleProjectJob, app.sql.MultiProjectJob], branch: Branch, build: Build, job: Job,
+                 cache: Cache, paths: ResultPaths, settings: Settings):
         """
         Constructor of class SharedLogic
 
@@ -43,6 +49,9 @@ class SharedLogic:
         :param branch: object of "Branch"
         :param build: object of "Build"
         :param job: object of "Job"
+        :param cache: object of "Cache" used by branch, build and job, invalidated on changes
+        :param paths: object of "ResultPaths" used when serving files of reports, updated on changes
+        :param settings: object of "Settings"
         """
 
         self.name = name
@@ -52,15 +61,38 @@ class SharedLogic:
         self.branch = branch
         self.build = build
         self.job = job
-
-
-    def GET(self, branch: Optional[str] = None, id: Optional[Union[str, int]] = None, *args: str) -> Optional[str]:
+        self.cache = cache
+        self.paths = paths
+        self.settings = settings
+        self.objects = Objects(f"{self.root_path}/data/{self.name}/{OBJECTS}") if self.settings.dedup else None
+        self.manifests = Manifests(objects=self.objects)
+        self.usage = Usage(f"{self.root_path}/data/{self.name}", self.log, self.objects is not None)
+        self.archives = Archives()
+
+        # a missing / unreadable usage index is rebuilt from the data in the background
+        if self.usage.stale:
+            threading.Thread(target=self.usage.scan, name=f"Usage-{self.name}", daemon=True).start()
+
+        # deleted data is moved into the trash at once and removed in the background, also what is left from before
+        self.trash = f"{self.root_path}/data/{self.name}/{TRASH}"
+        self.reaper = self.settings.reaper if self.settings.reaper is not None else Reaper()
+        self.reaper.scan(self.trash, self._collectObjects)
+
+        # uploads persisted for processing in the background but not processed before stopping are queued again
+        self.uploads = f"{self.root_path}/data/{self.name}/.ingest"
+        self._resumeUploads()
+
+
+    def GET(self, branch: Optional[str] = None, id: Optional[Union[str, int]] = None, *args: str,
+            after: Optional[str] = None, limit: Optional[str] = None) -> Optional[str]:
         """
         Shared logic for HTTP GET method
 
         :param branch: encoded branch name
         :param id: "latest" or build id
         :param args: possible parameters for a specific action
+        :param after: (optional) only list builds of branch with a higher build id
+        :param limit: (optional) maximum number of builds of branch listed
         :return: JSON or HTML report
         """
 
@@ -85,8 +117,12 @@ class SharedLogic:
                 cherrypy.response.status = 500
                 return
 
+            ret = json.dumps(info)
+            if self._notModified(contentETag(ret), self.settings.max_age):
+                return
+
             cherrypy.response.status = 200
-            return json.dumps(info)
+            return ret
 
         # 2) get branch information
         if type(branch) is not str:
@@ -96,7 +132,15 @@ class SharedLogic:
         branch = decodeBranchName(branch)
         if id is None:
             try:
-                info = self.branch.get(branch)
+                after = int(after) if after is not None else None
+                limit = int(limit) if limit is not None else None
+                assert (after is None or after >= 0) and (limit is None or limit > 0)
+            except (ValueError, AssertionError):
+                cherrypy.response.status = 400
+                return
+
+            try:
+                info = self.branch.get(branch, after, limit)
                 if info is None:
                     cherrypy.response.status = 404
                     return
@@ -117,14 +161,78 @@ class SharedLogic:
                 cherrypy.response.status = 500
                 return
 
+            ret = json.dumps(info)
+            if self._notModified(contentETag(ret), self.settings.max_age):
+                return
+
             cherrypy.response.status = 200
-            return json.dumps(info)
+            return ret
 
         # 3) get build information (latest or by id)
         if (type(id) is str and id != "latest") and type(id) not in [str, int]:
             cherrypy.response.status = 400
             return
 
+        # a build never changes after it was added, therefore clients can be answered without asking the database
+        etag: Optional[str] = None
+        max_age: Optional[int] = None
+        if id != "latest":
+            build_path = f"{self.root_path}/data/{self.name}/{encodeBranchName(branch)}/{id}" + \
+                (".zip" if self.settings.storage == "archive" else "")
+            etag = self._fileETag(build_path, branch, id, *args) if len(args) > 0 else \
+                buildETag(build_path, self.name, branch, id)
+            if etag is not None and matchesETag(etag):
+                self._notModified(etag)
+                return
+
+        # 4) get index.html report (or any part of it), only the result path is needed which is known in memory
+        if args is not None and len(args) > 0:
+            try:
+                build = self.paths.get(branch, None if id == "latest" else int(id))
+                if build is None:
+                    cherrypy.response.status = 404
+                    return
+            except ValueError:
+                cherrypy.response.status = 404
+                return
+            except (BuildConnectionException, BuildDatabaseException) as err:
+                self.log.error(
+                    __file__, "GET",
+                    f"Retrieving result path for build {id} of branch {branch} for job {self.name} threw an exception",
+                    err.message
+                )
+                cherrypy.response.status = 500
+                return
+
+            # the latest build changes with the next one added
+            if etag is None:
+                max_age = self.settings.max_age
+                etag = self._fileETag(build[1], branch, build[0], *args)
+                if etag is not None and matchesETag(etag):
+                    self._notModified(etag, max_age)
+                    return
+
+            if build[1].endswith(".zip"):
+                file, path = resolveArchiveFile(build[1], self.archives.get(build[1]), *args)
+            else:
+                file, path = resolveFile(
+                    build[1], *args, manifest=self.manifests.get(build[1]), offload=self.settings.offload,
+                    offload_root=f"{self.root_path}/data", offload_prefix=self.settings.offload_prefix
+                )
+            if file is None:
+                self.log.warning(
+                    __file__, "GET", f"Retrieving file '{path}' failed as it was not found!"
+                )
+
+                cherrypy.response.status = 404
+                return
+
+            if etag is not None:
+                setValidators(etag, max_age)
+
+            return file
+
+        # 5) get build information (latest or by id)
         if id == "latest":
             try:
                 info = self.build.last(branch)
@@ -140,54 +248,48 @@ class SharedLogic:
                 )
                 cherrypy.response.status = 500
                 return
-
-        try:
-            info = self.build.get(branch, id)
-            if info is None:
-                cherrypy.response.status = 404
+        else:
+            try:
+                info = self.build.get(branch, id)
+                if info is None:
+                    cherrypy.response.status = 404
+                    return
+                info["id"] = int(id)
+            except BuildConnectionException as err:
+                self.log.error(
+                    __file__, "GET",
+                    f"Retrieving general information for build {id} of branch {branch} for job {self.name} " +
+                    "threw a database connection exception", err.message
+                )
+                cherrypy.response.status = 500
+                return
+            except BuildDatabaseException as err:
+                self.log.error(
+                    __file__, "GET",
+                    f"Retrieving general information for build {id} of branch {branch} for job {self.name} " +
+                    "threw a MariaDB SQL exception", err.message
+                )
+                cherrypy.response.status = 500
                 return
-            info["id"] = int(id)
-        except BuildConnectionException as err:
-            self.log.error(
-                __file__, "GET",
-                f"Retrieving general information for build {id} of branch {branch} for job {self.name} " +
-                "threw a database connection exception", err.message
-            )
-            cherrypy.response.status = 500
-            return
-        except BuildDatabaseException as err:
-            self.log.error(
-                __file__, "GET",
-                f"Retrieving general information for build {id} of branch {branch} for job {self.name} " +
-                "threw a MariaDB SQL exception", err.message
-            )
-            cherrypy.response.status = 500
-            return
-
-        if args is None or len(args) == 0:
-            cherrypy.response.status = 200
-            return json.dumps(info)
-
-        # 4) get index.html report (or any part of it)
-        file, path = resolveFile(info["result_path"], *args)
-        if file is None:
-            self.log.warning(
-                __file__, "GET", f"Retrieving file '{path}' failed as it was not found!"
-            )
 
-            cherrypy.response.status = 404
+        ret = json.dumps(info)
+        if etag is not None:
+            setValidators(etag)
+        elif self._notModified(contentETag(ret), self.settings.max_age):
             return
 
-        return file
+        cherrypy.response.status = 200
+        return ret
 
 
-    def POST(self, metadata_file: Part, zip_file: Part, failed_junit_tests: Optional[Part] = None):
+    def POST(self, metadata_file: Part, zip_file: Part, failed_junit_tests: Optional[Part] = None) -> Optional[str]:
         """
         Shared logic for HTTP POST method
 
         :param metadata_file: JSON file containing metadata
         :param zip_file: ZIP archive containing build information
         :param failed_junit_tests: TXT file containing all failed jUnit tests (maybe null)
+        :return: None or JSON of ingest ticket when processed in the background
         """
 
         # 1) check parameters
@@ -228,74 +330,268 @@ class SharedLogic:
         branch = metadata_json["branch"]
         branch_encoded = encodeBranchName(branch)
 
+        # the request body is gone once the upload is processed in the background, therefore read it right away
+        content = None
+        if failed_junit_tests is not None:
+            content = loadFailedJunitTestsTXT(failed_junit_tests)
+            if content is None:
+                self.log.warning(
+                    __file__, "POST", f"Reading 'failed_junit_tests.txt' for build {id} for branch {branch} for job " +
+                    f"{self.name} failed. This is not a problem in this case but should be noted!"
+                )
+
+        # 3) process upload synchronously when no ingest queue is used
+        if self.settings.ingest is None:
+            cherrypy.response.status = self.ingest(metadata_json, zip_file, content)
+            if cherrypy.response.status == 201:
+                cherrypy.response.headers["Access-Control-Expose-Headers"] = "Location"
+                cherrypy.response.headers["Location"] = f"/{self.name}/{branch_encoded}/{id}"
+            return
+
+        # 4) otherwise persist upload (only if not already exist) and process it in the background
         connection: Optional[mariadb.connection] = None
 
         try:
             connection = self.sql.connection.get()
-
-            # 3) unzip ZIP archive (only if not already exist)
-            if self.sql.builds.get(connection, id, branch) is not None or not unzipData(
-                zip_file, f"{self.root_path}/data/{self.name}/{branch_encoded}/{id}"
-            ):
+            if self.sql.builds.get(connection, id, branch) is not None:
                 self.log.error(
                     __file__, "POST", f"Adding new test results for build {id} for branch {branch} for job " +
-                    f"{self.name} failed due to failures unzipping ZIP archive, might already exist!"
+                    f"{self.name} failed because it already exists!"
                 )
                 cherrypy.response.status = 409
                 return
+        except ConnectionException as err:
+            self.log.error(
+                __file__, "POST", f"Adding new test results for build {id} for branch {branch} for job {self.name} " +
+                "failed due to creating connection failed with an exception", err.message
+            )
+            cherrypy.response.status = 500
+            return
+        except mariadb.Error as err:
+            self.log.error(
+                __file__, "POST", f"Adding new test results for build {id} for branch {branch} for job " +
+                f"{self.name} failed due to reading SQL from table Builds failed with an exception", err
+            )
+            cherrypy.response.status = 500
+            return
+        finally:
+            if connection is not None:
+                connection.close()
 
-            tests = parseJUnitXMLResults(f"{self.root_path}/data/{self.name}/{branch_encoded}/{id}")
+        # the metadata is persisted next to the ZIP archive, so the upload is queued again when restarting
+        upload = f"{self.uploads}/{uuid.uuid4().hex}"
+        if not saveUpload(zip_file, f"{upload}.zip") or not self._saveUploadMetadata(upload, metadata_json, content):
+            self._removeUpload(upload)
+            self.log.error(
+                __file__, "POST", f"Adding new test results for build {id} for branch {branch} for job " +
+                f"{self.name} failed due to failures saving ZIP archive for processing it in the background!"
+            )
+            cherrypy.response.status = 500
+            return
 
-            # 4) add build data to database (branch, build and optional subproject / subprojects_in_build)
-            self.sql.branches.add(connection, branch)
-            self.sql.builds.add(
-                connection, id, branch, metadata_json["gCommit"], metadata_json["version"], metadata_json["rc"],
-                tests["successful"] if tests is not None else 0, tests["skipped"] if tests is not None else 0,
-                tests["flaky"] if tests is not None else 0, tests["failed"] if tests is not None else 0,
-                metadata_json["type"], f"{self.root_path}/data/{self.name}/{branch_encoded}/{id}"
+        try:
+            ticket = self._submitUpload(upload, metadata_json, content)
+        except IngestDuplicateException as err:
+            self._removeUpload(upload)
+            self.log.error(
+                __file__, "POST", f"Adding new test results for build {id} for branch {branch} for job " +
+                f"{self.name} failed because it is already being processed", err.message
+            )
+            cherrypy.response.status = 409
+            return
+        except IngestQueueFullException as err:
+            self._removeUpload(upload)
+            self.log.error(
+                __file__, "POST", f"Adding new test results for build {id} for branch {branch} for job " +
+                f"{self.name} failed because too many uploads are waiting", err.message
             )
+            cherrypy.response.headers["Retry-After"] = "30"
+            cherrypy.response.status = 503
+            return
+
+        self.log.info(
+            __file__, "POST", f"Queued new test results for build {id} for branch {branch} for job {self.name} as " +
+            f"{ticket.id}"
+        )
 
+        cherrypy.response.headers["Access-Control-Expose-Headers"] = "Location"
+        cherrypy.response.headers["Location"] = f"/ingest/{ticket.id}"
+        cherrypy.response.status = 202
+        return json.dumps(ticket.json())
+
+
+    def ingest(self, metadata_json: dict[str, Any], zip_file: Union[Part, str],
+               failed_junit_tests: Optional[str]) -> int:
+        """
+        Adds new test results: unzips the ZIP archive, parses the results and writes them to the database
+
+        :param metadata_json: metadata returned by "parseJUnitMetadata"
+        :param zip_file: ZIP archive (in CherryPy object) or path to an upload saved with "saveUpload"
+        :param failed_junit_tests: (optional) content of TXT file containing all failed jUnit tests
+        :return: HTTP status code, 201 when added
+        """
+
+        id = metadata_json["id"]
+        branch = metadata_json["branch"]
+        branch_encoded = encodeBranchName(branch)
+
+        # the upload is extracted to a directory of its own and only moved in place once added to the database, so
+        # concurrent uploads of the same build never write to / remove the same files (when keeping the ZIP archive
+        # only the files needed for parsing are extracted, temporarily)
+        build_path = f"{self.root_path}/data/{self.name}/{branch_encoded}/{id}"
+        archive = self.settings.storage == "archive"
+        extract_path = f"{self.uploads}/{uuid.uuid4().hex}"
+        result_path = f"{build_path}.zip" if archive else build_path
+
+        connection: Optional[mariadb.connection] = None
+        stored = False
+        added = False
+
+        try:
+            # 3) check whether the build already exists, a connection is only held while using the database (not while
+            #    extracting / parsing, which might take long for big uploads)
+            connection = self.sql.connection.get()
+            exists = self.sql.builds.get(connection, id, branch) is not None or os.path.exists(result_path)
+            connection.close()
+            connection = None
+
+            if exists:
+                self.log.error(
+                    __file__, "POST", f"Adding new test results for build {id} for branch {branch} for job " +
+                    f"{self.name} failed because it already exists!"
+                )
+                return 409
+
+            # 4) unzip ZIP archive, XML files are parsed while still extracting
+            try:
+                with JUnitXMLCollector(
+                    extract_path,
+                    metadata_json["subprojects"] if isinstance(self.sql, app.sql.MultiProjectJob) else None,
+                    self.settings.parser
+                ) as collector:
+                    unzipData(zip_file, extract_path, collector.add, selectJUnitFiles if archive else None)
+
+                    # every XML file is only parsed once, even when counted for the build and its subproject
+                    tests, subproject_tests = collector.results()
+            except InvalidUploadException as err:
+                self.log.error(
+                    __file__, "POST", f"Adding new test results for build {id} for branch {branch} for job " +
+                    f"{self.name} failed due to an invalid ZIP archive", err.message
+                )
+                return 400
+            except OSError as err:
+                self.log.error(
+                    __file__, "POST", f"Adding new test results for build {id} for branch {branch} for job " +
+                    f"{self.name} failed due to failures unzipping ZIP archive", err
+                )
+                return 500
+
+            # 5) keep the ZIP archive itself (including failed_junit_tests.txt) instead of the extracted files
+            if archive:
+                if not storeArchive(
+                    zip_file, result_path,
+                    {"failed_junit_tests.txt": failed_junit_tests} if failed_junit_tests is not None else None
+                ):
+                    self.log.error(
+                        __file__, "POST", f"Adding new test results for build {id} for branch {branch} for job " +
+                        f"{self.name} failed due to failures storing ZIP archive, might already exist!"
+                    )
+                    return 409 if os.path.exists(result_path) else 500
+
+                stored = True
+
+            # 6) add build data to database (branch, build and optional subproject / subprojects_in_build) at once
+            if tests is None:
+                tests = {"successful": 0, "skipped": 0, "flaky": 0, "failed": 0}
+
+            subprojects = []
             if isinstance(self.sql, app.sql.MultiProjectJob):
                 for subproject in metadata_json["subprojects"]:
-                    self.sql.subprojects.add(connection, subproject)
-                    tests = parseJUnitXMLResults(
-                        f"{self.root_path}/data/{self.name}/{branch_encoded}/{id}/projects/{subproject}"
-                    )
-                    duration = parseJUnitHTMLDuration(
-                        f"{self.root_path}/data/{self.name}/{branch_encoded}/{id}/projects/{subproject}/index.html"
+                    results = subproject_tests[subproject]
+                    duration = parseJUnitHTMLDuration(f"{extract_path}/projects/{subproject}/index.html")
+
+                    subprojects.append(
+                        {
+                            "subproject": subproject,
+                            "tests_success": results["successful"] if results is not None else 0,
+                            "tests_skipped": results["skipped"] if results is not None else 0,
+                            "tests_flaky": results["flaky"] if results is not None else 0,
+                            "tests_failed": results["failed"] if results is not None else 0,
+                            "result_url": f"{self.name}/{branch_encoded}/{id}/projects/{subproject}/index.html",
+                            "duration": duration if duration is not None else 0.0
+                        }
                     )
 
-                    self.sql.subprojects_in_build.add(
-                        connection, branch, id, subproject, tests["successful"] if tests is not None else 0,
-                        tests["skipped"] if tests is not None else 0, tests["flaky"] if tests is not None else 0,
-                        tests["failed"] if tests is not None else 0,
-                        f"{self.name}/{branch_encoded}/{id}/projects/{subproject}/index.html",
-                        duration if not None else 0.0
-                    )
+            connection = self.sql.connection.get()
+            build = (
+                connection, id, branch, metadata_json["gCommit"], metadata_json["version"], metadata_json["rc"],
+                tests["successful"], tests["skipped"], tests["flaky"], tests["failed"], metadata_json["type"],
+                result_path
+            )
 
-            # 5) save failed_junit_tests.txt if provided using REST call
-            if failed_junit_tests is not None:
+            if isinstance(self.sql, app.sql.MultiProjectJob):
+                self.sql.addBuild(*build, subprojects)
+            else:
+                self.sql.addBuild(*build)
+            added = True
+
+            # 7) move the extracted files in place, a concurrent upload of the same build already failed adding it
+            if not archive:
                 try:
-                    content = loadFailedJunitTestsTXT(failed_junit_tests)
-                    with open(
-                            f"{self.root_path}/data/{self.name}/{branch_encoded}/{id}/failed_junit_tests.txt", "x"
-                    ) as f:
-                        f.write(content)
-                except Exception:
-                    self.log.warning(
-                        __file__, "POST", f"Saving 'failed_junit_tests.txt' for build {id} for branch {branch} for " +
-                        f"job {self.name} failed with an exception. This is not a problem in this case but should " +
-                        f"be noted!"
+                    os.makedirs(os.path.dirname(build_path), exist_ok=True)
+                    os.rename(extract_path, build_path)
+                except OSError as err:
+                    self.sql.builds.rem(connection, id, branch)
+                    added = False
+                    self.log.error(
+                        __file__, "POST", f"Adding new test results for build {id} for branch {branch} for job " +
+                        f"{self.name} failed due to moving the extracted files in place failed, might already exist!",
+                        err
                     )
+                    return 409 if os.path.exists(build_path) else 500
+
+            connection.close()
+            connection = None
+            self.cache.invalidate(branch)
+            self.paths.add(branch, id, result_path)
+
+            if not archive:
+                # 8) save failed_junit_tests.txt if provided using REST call
+                if failed_junit_tests is not None:
+                    try:
+                        with open(f"{build_path}/failed_junit_tests.txt", "x") as f:
+                            f.write(failed_junit_tests)
+                    except Exception:
+                        self.log.warning(
+                            __file__, "POST", f"Saving 'failed_junit_tests.txt' for build {id} for branch {branch} " +
+                            f"for job {self.name} failed with an exception. This is not a problem in this case but " +
+                            f"should be noted!"
+                        )
+
+                # 9) list all files of the build, so they are served without asking the file system
+                self.manifests.write(build_path)
+
+            # 10) remember the disk space used by the build (deduplicated files only with their share)
+            self.usage.add(branch, id, diskUsage(result_path, self.objects is not None))
+
+            # 11) write compressed variants of the report files in the background, served when accepted by clients
+            if not archive and self.settings.precompress is not None:
+                self.settings.precompress.submit(build_path, lambda path: self._compressed(branch, id, path))
         except ConnectionException as err:
             self.log.error(
                 __file__, "POST", f"Adding new test results for build {id} for branch {branch} for job {self.name} " +
                 "failed due to creating connection failed with an exception", err.message
             )
-            cherrypy.response.status = 500
-            return
+            return 500
         except mariadb.Error as err:
-            if isinstance(self.sql, app.sql.MultiProjectJob):
+            if getattr(err, "errno", None) == app.sql.ER_DUP_ENTRY:
+                # a concurrent upload of the same build was added first
+                self.log.error(
+                    __file__, "POST", f"Adding new test results for build {id} for branch {branch} for job " +
+                    f"{self.name} failed because it already exists!"
+                )
+                return 409
+            elif isinstance(self.sql, app.sql.MultiProjectJob):
                 self.log.error(
                     __file__, "POST", f"Adding new test results for build {id} for branch {branch} for job " +
                     f"{self.name} failed due to writing SQL to table Branches / Builds / Subprojects / " +
@@ -306,20 +602,31 @@ class SharedLogic:
                     __file__, "POST", f"Adding new test results for build {id} for branch {branch} for job " +
                     f"{self.name} failed due to writing SQL to table Branches / Builds failed with an exception", err
                 )
-            cherrypy.response.status = 500
-            return
+            return 500
+        except Exception as err:
+            self.log.error(
+                __file__, "POST", f"Adding new test results for build {id} for branch {branch} for job {self.name} " +
+                "failed due to an unforeseen exception", err
+            )
+            raise
         finally:
+            # nothing was written to the database (any failure), therefore the archive stored is not referenced, only
+            # data created by this upload is removed (extracted files left over when not moved in place)
+            if stored and not added:
+                try:
+                    os.remove(result_path)
+                except OSError:
+                    pass
             if connection is not None:
                 connection.close()
+            shutil.rmtree(extract_path, ignore_errors=True)
 
         self.log.info(
             __file__, "POST", f"Successfully added new test results for build {id} for branch {branch} for job " +
             f"{self.name} with corresponding JSON data: {metadata_json}"
         )
 
-        cherrypy.response.headers["Access-Control-Expose-Headers"] = "Location"
-        cherrypy.response.headers["Location"] = f"/{self.name}/{branch_encoded}/{id}"
-        cherrypy.response.status = 201
+        return 201
 
 
     def PUT(self, input_json: dict[str, Any]):
@@ -341,6 +648,7 @@ class SharedLogic:
 
             connection = self.sql.connection.get()
             self.sql.general.update(connection, job, git)
+            self.cache.invalidate()
         except KeyError as err:
             self.log.error(
                 __file__, "PUT", f"Updating general information for job {self.name} failed due to missing JSON " +
@@ -389,8 +697,7 @@ class SharedLogic:
         branch = decodeBranchName(branch)
 
         try:
-            info = self.branch.get(branch)
-            if info is None:
+            if self.branch.get(branch, limit=1) is None:
                 cherrypy.response.status = 404
                 return
         except BranchConnectionException as err:
@@ -418,7 +725,8 @@ class SharedLogic:
                     self.sql.subprojects_in_build.rem(connection, branch, None)
                 self.sql.builds.rem(connection, None, branch)
                 self.sql.branches.rem(connection, branch)
-                shutil.rmtree(f"{self.root_path}/data/{self.name}/{encodeBranchName(branch)}", ignore_errors=True)
+                self.discard([f"{self.root_path}/data/{self.name}/{encodeBranchName(branch)}"])
+                self.usage.remove(branch)
             except ConnectionException as err:
                 self.log.error(
                     __file__, "DELETE", f"Deleting branch {branch} for job {self.name} failed due to creating " +
@@ -447,6 +755,10 @@ class SharedLogic:
                 cherrypy.response.status = 500
                 return
             finally:
+                self.cache.invalidate(branch)
+                self.paths.remove(branch)
+                self.manifests.forget(f"{self.root_path}/data/{self.name}/{encodeBranchName(branch)}")
+                self.archives.forget(f"{self.root_path}/data/{self.name}/{encodeBranchName(branch)}")
                 if connection is not None:
                     connection.close()
 
@@ -475,51 +787,356 @@ class SharedLogic:
             cherrypy.response.status = 400
             return
 
-        if keep < len(info["builds"]):
-            try:
-                connection = self.sql.connection.get()
-                for build in info["builds"][:-keep]:
-                    if isinstance(self.sql, app.sql.MultiProjectJob):
-                        self.sql.subprojects_in_build.rem(connection, branch, build)
-                    self.sql.builds.rem(connection, build, branch)
-                    shutil.rmtree(
-                        f"{self.root_path}/data/{self.name}/{encodeBranchName(branch)}/{build}", ignore_errors=True
-                    )
-            except ConnectionException as err:
+        try:
+            builds = self.prune(branch, keep)
+        except ConnectionException as err:
+            self.log.error(
+                __file__, "DELETE", f"Deleting builds (keep {keep}) for branch {branch} for job {self.name} " +
+                "failed due to creating connection failed with an exception", err.message
+            )
+            cherrypy.response.status = 500
+            return
+        except mariadb.Error as err:
+            if isinstance(self.sql, app.sql.MultiProjectJob):
                 self.log.error(
                     __file__, "DELETE", f"Deleting builds (keep {keep}) for branch {branch} for job {self.name} " +
-                    "failed due to creating connection failed with an exception", err.message
+                    "failed due to writing SQL to table Builds / Subprojects_in_Build failed with an exception", err
                 )
-                cherrypy.response.status = 500
-                return
-            except mariadb.Error as err:
-                if isinstance(self.sql, app.sql.MultiProjectJob):
-                    self.log.error(
-                        __file__, "DELETE", f"Deleting builds (keep {keep}) for branch {branch} for job {self.name} " +
-                        "failed due to writing SQL to table Branches / Builds / Subprojects_in_Build failed with an " +
-                        "exception", err
-                    )
-                else:
-                    self.log.error(
-                        __file__, "DELETE", f"Deleting builds (keep {keep}) for branch {branch} for job {self.name} " +
-                        "failed due to writing SQL to table Branches / Builds failed with an exception", err
-                    )
-                cherrypy.response.status = 500
-                return
-            except Exception as err:
+            else:
                 self.log.error(
                     __file__, "DELETE", f"Deleting builds (keep {keep}) for branch {branch} for job {self.name} " +
-                    "failed due to an unforeseen exception", err
+                    "failed due to writing SQL to table Builds failed with an exception", err
                 )
-                cherrypy.response.status = 500
-                return
-            finally:
-                if connection is not None:
-                    connection.close()
+            cherrypy.response.status = 500
+            return
+        except Exception as err:
+            self.log.error(
+                __file__, "DELETE", f"Deleting builds (keep {keep}) for branch {branch} for job {self.name} " +
+                "failed due to an unforeseen exception", err
+            )
+            cherrypy.response.status = 500
+            return
 
+        if len(builds) > 0:
             self.log.info(
-                __file__, "DELETE", f"Successfully deleted all but {keep} builds for branch {branch} for job " +
-                f"{self.name}!"
+                __file__, "DELETE", f"Successfully deleted all but {keep} builds ({len(builds)} builds) for branch " +
+                f"{branch} for job {self.name}!"
             )
 
         cherrypy.response.status = 202
+
+
+    def prune(self, branch: str, keep: Optional[int] = None, max_days: Optional[float] = None,
+              before: Optional[int] = None) -> list[int]:
+        """
+        Deletes old builds of a branch (the latest build is always kept): the database rows at once in a single
+        transaction, their files are moved into the trash and removed in the background
+
+        :param branch: branch name
+        :param keep: (optional) number of latest builds to keep (at least one)
+        :param max_days: (optional) days builds are kept
+        :param before: (optional) build id, all older builds are deleted as well
+        :return: ids of the deleted builds
+        :exception ConnectionException: when connection could not be established
+        :exception mariadb.Error: when errors with the database connection occurred, nothing is deleted in this case
+        """
+
+        connection: Optional[mariadb.connection] = None
+
+        try:
+            connection = self.sql.connection.get()
+            expired = self._expired(connection, branch, max_days) if max_days is not None else None
+            if before is not None:
+                expired = max(expired, before) if expired is not None else before
+            builds = self.sql.pruneBuilds(connection, branch, keep, expired)
+        finally:
+            if connection is not None:
+                connection.close()
+
+        if len(builds) == 0:
+            return []
+
+        self.cache.invalidate(branch)
+        self.paths.remove(branch)
+        for _, result_path in builds:
+            self.manifests.forget(result_path)
+            self.archives.forget(result_path)
+
+        branch_path = f"{self.root_path}/data/{self.name}/{encodeBranchName(branch)}"
+        self.discard([f"{branch_path}/{id}{suffix}" for id, _ in builds for suffix in ("", ".zip")])
+        self.usage.remove(branch, [id for id, _ in builds])
+
+        return [id for id, _ in builds]
+
+
+    def discard(self, paths: list[str]):
+        """
+        Moves deleted data (branches, builds or ZIP archives of builds) into the trash, it is removed in the background
+        and the objects no longer referenced afterwards (once, after all data was removed)
+
+        :param paths: paths of the data, the ones not existing are skipped
+        """
+
+        trashed: list[str] = []
+        for path in paths:
+            try:
+                target = moveToTrash(path, self.trash)
+                if target is not None:
+                    trashed.append(target)
+            except OSError as err:
+                self.log.error(
+                    __file__, "DELETE", f"Moving '{path}' into the trash for job {self.name} failed with an " +
+                    "exception, it has to be removed manually!", err
+                )
+
+        for i, target in enumerate(trashed):
+            self.reaper.submit(target, self._collectObjects if i == len(trashed) - 1 else None)
+
+
+    def _submitUpload(self, upload: str, metadata_json: dict[str, Any],
+                      failed_junit_tests: Optional[str]) -> IngestTicket:
+        """
+        Queues an upload persisted for processing in the background, its files are removed once it was processed. The
+        ticket id is the name of the upload, so it stays the same when queued again after restarting
+
+        :param upload: path of the upload without extension, see "_saveUploadMetadata"
+        :param metadata_json: metadata returned by "parseJUnitMetadata"
+        :param failed_junit_tests: (optional) content of TXT file containing all failed jUnit tests
+        :return: ticket of upload
+        :exception IngestDuplicateException: when the same build is already queued / processed
+        :exception IngestQueueFullException: when no more uploads can be queued
+        """
+
+        def task() -> int:
+            try:
+                return self.ingest(metadata_json, f"{upload}.zip", failed_junit_tests)
+            finally:
+                self._removeUpload(upload)
+
+        return self.settings.ingest.submit(
+            self.name, f"/{self.name}/{encodeBranchName(metadata_json['branch'])}/{metadata_json['id']}", task,
+            os.path.basename(upload)
+        )
+
+
+    def _saveUploadMetadata(self, upload: str, metadata_json: dict[str, Any],
+                            failed_junit_tests: Optional[str]) -> bool:
+        """
+        Saves the metadata of an upload next to its ZIP archive ("<upload>.json"), it only appears complete and marks
+        the upload as accepted
+
+        :param upload: path of the upload without extension, the ZIP archive is "<upload>.zip"
+        :param metadata_json: metadata returned by "parseJUnitMetadata"
+        :param failed_junit_tests: (optional) content of TXT file containing all failed jUnit tests
+        :return: True if everything worked correctly, False otherwise
+        """
+
+        try:
+            with open(f"{upload}.json.tmp", "w") as f:
+                json.dump({"metadata": metadata_json, "failed_junit_tests": failed_junit_tests}, f)
+            os.replace(f"{upload}.json.tmp", f"{upload}.json")
+        except (OSError, TypeError, ValueError):
+            return False
+
+        return True
+
+
+    def _removeUpload(self, upload: str):
+        """
+        Removes the files of an upload persisted for processing in the background
+
+        :param upload: path of the upload without extension
+        """
+
+        for suffix in (".zip", ".json", ".json.tmp"):
+            try:
+                os.remove(upload + suffix)
+            except OSError:
+                pass
+
+
+    def _resumeUploads(self):
+        """
+        Queues the uploads accepted but not processed before the server stopped again (with their former ticket id),
+        removes what is left of uploads not accepted completely and of extracting ZIP archives
+        """
+
+        try:
+            with os.scandir(self.uploads) as entries:
+                paths = sorted(entry.path for entry in entries)
+        except OSError:
+            return
+
+        for path in paths:
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+                continue
+
+            upload, extension = os.path.splitext(path)
+            if extension == ".zip" and os.path.exists(f"{upload}.json"):
+                continue
+            if extension != ".json":
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+
+            try:
+                with open(path, "r") as f:
+                    info = json.load(f)
+                metadata_json = info["metadata"]
+                failed_junit_tests = info["failed_junit_tests"]
+            except (OSError, ValueError, LookupError, TypeError):
+                self._removeUpload(upload)
+                continue
+
+            if self.settings.ingest is None:
+                self.log.warning(
+                    __file__, "INIT", f"Upload '{upload}.zip' for job {self.name} is not processed as no ingest " +
+                    "queue is used, it is kept until one is used again!"
+                )
+                continue
+
+            try:
+                ticket = self._submitUpload(upload, metadata_json, failed_junit_tests)
+            except IngestDuplicateException as err:
+                self._removeUpload(upload)
+                self.log.error(
+                    __file__, "INIT", f"Queuing upload '{upload}.zip' for job {self.name} again failed because it is " +
+                    "already being processed", err.message
+                )
+                continue
+            except IngestQueueFullException as err:
+                self.log.warning(
+                    __file__, "INIT", f"Queuing upload '{upload}.zip' for job {self.name} again failed because too " +
+                    "many uploads are waiting, it is kept for the next start", err.message
+                )
+                continue
+
+            self.log.info(
+                __file__, "INIT", f"Queued upload of build {metadata_json['id']} for branch " +
+                f"{metadata_json['branch']} for job {self.name} again as {ticket.id}"
+            )
+
+
+    def _expired(self, connection: mariadb.connection, branch: str, max_days: float) -> Optional[int]:
+        """
+        Returns the build id of the first build of a branch not older than a number of days. The database does not know
+        when a build was added, so this is the modification time of its data (build ids are ascending in time, therefore
+        only some builds have to be checked). Builds without data are not expired.
+
+        :param connection: connection to database
+        :param branch: branch name
+        :param max_days: days builds are kept
+        :return: build id (all older builds expired) or None when no build expired
+        :exception mariadb.Error: when errors with the database connection occurred
+        """
+
+        ids = self.sql.builds.ids(connection, branch)
+        deadline = time.time() - max_days * 24 * 60 * 60
+
+        low, high = 0, len(ids)
+        while low < high:
+            middle = (low + high) // 2
+            added = self._added(branch, ids[middle])
+            if added is not None and added < deadline:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low == 0:
+            return None
+
+        return ids[low] if low < len(ids) else ids[-1] + 1
+
+
+    def _added(self, branch: str, id: int) -> Optional[float]:
+        """
+        Returns when a build was added, using the modification time of its data
+
+        :param branch: branch name
+        :param id: build id
+        :return: seconds since the epoch or None when the build has no data
+        """
+
+        for path in (f"{self.root_path}/data/{self.name}/{encodeBranchName(branch)}/{id}",
+                     f"{self.root_path}/data/{self.name}/{encodeBranchName(branch)}/{id}.zip"):
+            try:
+                return os.stat(path).st_mtime
+            except OSError:
+                continue
+
+        return None
+
+
+    def _fileETag(self, build_path: str, branch: str, id: Union[str, int], *args: str) -> Optional[str]:
+        """
+        Creates the ETag of a file of a build, using its manifest when available and the file system otherwise
+
+        :param build_path: path of the build data
+        :param branch: branch name
+        :param id: build id
+        :param args: path of the file
+        :return: ETag or None when build / file does not exist
+        """
+
+        # the ETag depends on the encoding, therefore also responses with 304 have to tell caches
+        manifest = self.manifests.get(build_path)
+        if manifest is not None:
+            relative_path = manifest.resolve(*args)
+            if relative_path is not None:
+                varyEncoding(os.path.join(manifest.root, relative_path), manifest.exists)
+            return manifestETag(manifest, *args)
+
+        varyEncoding(os.path.join(build_path, *args))
+        return buildETag(
+            build_path, self.name, branch, id, *args, encoding=negotiateEncoding(os.path.join(build_path, *args))
+        )
+
+
+    def _compressed(self, branch: str, id: int, build_path: str):
+        """
+        Updates manifest and disk space used of a build after the precompressed variants of its files were written
+
+        :param branch: branch name
+        :param id: build id
+        :param build_path: path of the build data
+        """
+
+        self.manifests.write(build_path)
+        self.usage.update(branch, id, diskUsage(build_path, self.objects is not None))
+
+
+    def _collectObjects(self, trashed: Optional[str] = None):
+        """
+        Removes objects of deduplicated files no longer referenced by any build (after builds were deleted)
+
+        :param trashed: (optional) path inside the trash removed before
+        """
+
+        if self.objects is None:
+            return
+
+        files, size = self.objects.collect()
+        if files > 0:
+            self.log.info(
+                __file__, "DELETE", f"Removed {files} unreferenced objects ({size} bytes) for job {self.name}!"
+            )
+
+
+    def _notModified(self, etag: str, max_age: Optional[int] = None) -> bool:
+        """
+        Sets the caching headers and answers with 304 when the client already has the resource
+
+        :param etag: ETag of the resource
+        :param max_age: (optional) seconds the resource can be reused, never changes if not provided
+        :return: True when answered with 304, False otherwise
+        """
+
+        setValidators(etag, max_age)
+        if not matchesETag(etag):
+            return False
+
+        cherrypy.response.status = 304
+        return True
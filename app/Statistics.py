@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+app/Statistics.py
+
+Copyright (C) 2021-2023, VISUS Health IT GmbH
+This software and supporting documentation were developed by
+  VISUS Health IT GmbH
+  Gesundheitscampus-Sued 15
+  D-44801 Bochum, Germany
+  http://www.visus.com
+  mailto:info@visus.com
+
+-> see LICENCE at root of repository
+"""
+
+import cherrypy
+import json
+
+from typing import Optional, Union
+from app.MultiProjectJob import MultiProjectJob
+from app.SingleProjectJob import SingleProjectJob
+from app.util import IngestQueue, Precompressor, Reaper
+
+
+@cherrypy.expose
+class Statistics:
+    """
+    Interface to query runtime statistics of all jobs
+    """
+
+    def __init__(self, jobs: list[Union[MultiProjectJob, SingleProjectJob]], ingest: Optional[IngestQueue] = None,
+                 precompress: Optional[Precompressor] = None, reaper: Optional[Reaper] = None):
+        """
+        Constructor of class Statistics
+
+        :param jobs: all mounted jobs
+        :param ingest: (optional) shared ingest queue of all jobs
+        :param precompress: (optional) shared compressor of report files of all jobs
+        :param reaper: (optional) shared remover of deleted files of all jobs
+        """
+
+        self.jobs = jobs
+        self.ingest = ingest
+        self.precompress = precompress
+        self.reaper = reaper
+
+
+    def GET(self) -> str:
+        """
+        Depicts the route to show statistics
+
+        Routes:     1) /    -> statistics on all jobs
+
+        HTTP-Code:  1) 200, correct request
+
+        :return: {
+                    "jobs": {
+                        <job name>: {
+                            "connections": <see "Connection.stats">,
+                            "cache": <see "Cache.stats">,
+                            "usage": <bytes of build data, see "Usage.total">,
+                            "objects": <(optional) see "Objects.stats">
+                        },
+                        ...
+                    },
+                    "ingest": <(optional) see "IngestQueue.stats">,
+                    "precompress": <(optional) see "Precompressor.stats">,
+                    "reaper": <(optional) see "Reaper.stats">
+                }
+        """
+
+        ret = {
+            "jobs": {
+                job.name: {
+                    "connections": job.sql.connection.stats(),
+                    "cache": job.cache.stats(),
+                    "usage": job.sharedlogic.usage.total()
+                } for job in self.jobs
+            }
+        }
+
+        for job in self.jobs:
+            if job.sharedlogic.objects is not None:
+                ret["jobs"][job.name]["objects"] = job.sharedlogic.objects.stats()
+
+        if self.ingest is not None:
+            ret["ingest"] = self.ingest.stats()
+
+        if self.precompress is not None:
+            ret["precompress"] = self.precompress.stats()
+
+        if self.reaper is not None:
+            ret["reaper"] = self.reaper.stats()
+
+        cherrypy.response.status = 200
+        return json.dumps(ret)
@@ -15,6 +15,10 @@ This software and supporting documentation were developed by
 -> see LICENCE at root of repository
 """
 
+from .IngestStatus import IngestStatus
 from .MultiProjectJob import MultiProjectJob
+from .Reconciler import Reconciler
+from .RetentionScheduler import RetentionScheduler
 from .SharedLogic import SharedLogic
 from .SingleProjectJob import SingleProjectJob
+from .Statistics import Statistics
@@ -20,6 +20,7 @@ import app.sql.MultiProjectJob
 import app.sql.SingleProjectJob
 
 from typing import Optional, Union
+from app.data.Cache import Cache
 from app.sql import ConnectionException
 
 
@@ -60,49 +61,68 @@ class Branch:
     Build data returned to user on REST API when accessing: http://<backend>/<project>/<branch>
     """
 
-    def __init__(self, project: Union[app.sql.MultiProjectJob, app.sql.SingleProjectJob]):
+    def __init__(self, project: Union[app.sql.MultiProjectJob, app.sql.SingleProjectJob],
+                 cache: Optional[Cache] = None):
         """
         Constructor of class "Branch"
 
         :param project: single or multiple project job
+        :param cache: (optional) cache shared with the other data of the job, nothing is cached if not provided
         """
 
         self.project = project
+        self.cache = cache if cache is not None else Cache(0)
 
 
-    def get(self, branch: str) -> Optional[dict[str, Union[int, list[int]]]]:
+    def get(self, branch: str, after: Optional[int] = None,
+            limit: Optional[int] = None) -> Optional[dict[str, Union[int, list[int]]]]:
         """
         Get branch specific information in JSON format
 
         :param branch: to get the builds from
+        :param after: (optional) only list builds with a higher build id
+        :param limit: (optional) maximum number of builds listed
         :return: {
                     "first": <smallest build id>,
                     "last": <highest build id>,
                     "builds": [
                         <build id>,
                         ...
-                    ]
+                    ],
+                    "next": <(optional) build id to be used as "after" to get the next builds>
                 } OR None
         :exception BranchConnectionException: when connection could not be established
         :exception BranchDatabaseException: when SQL data could not be aggregated
         """
 
+        return self.cache.get(("branch", branch, after, limit), lambda: self._get(branch, after, limit))
+
+
+    def _get(self, branch: str, after: Optional[int],
+             limit: Optional[int]) -> Optional[dict[str, Union[int, list[int]]]]:
+        """
+        Reads the data returned by "get" from the database, bypassing the cache
+        """
+
         connection: Optional[mariadb.connection] = None
 
         try:
             connection = self.project.connection.get()
 
-            builds = self.project.builds.all(connection, branch)
-            if builds is None:
+            ids = self.project.builds.range(connection, branch)
+            if ids is None:
                 return None
 
-            return {
-                "first": builds[0]["id"],
-                "last": builds[-1]["id"],
-                "builds": [
-                    build["id"] for build in builds
-                ]
+            ret = {
+                "first": ids[0],
+                "last": ids[1],
+                "builds": self.project.builds.ids(connection, branch, after, limit)
             }
+
+            if limit is not None and len(ret["builds"]) == limit and ret["builds"][-1] < ids[1]:
+                ret["next"] = ret["builds"][-1]
+
+            return ret
         except ConnectionException as err:
             raise BranchConnectionException(
                 f"Creating connection for project {self.project.name} failed with an exception: {err}"
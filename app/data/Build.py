@@ -20,6 +20,7 @@ import app.sql.MultiProjectJob
 import app.sql.SingleProjectJob
 
 from typing import Optional, Union
+from app.data.Cache import Cache
 from app.sql import ConnectionException
 
 
@@ -64,14 +65,17 @@ class Build:
     Multi project index.html    -> http://<backend>/<project>/<branch>/{latest | <build id>}/projects/<name>/index.html
     """
 
-    def __init__(self, project: Union[app.sql.MultiProjectJob, app.sql.SingleProjectJob]):
+    def __init__(self, project: Union[app.sql.MultiProjectJob, app.sql.SingleProjectJob],
+                 cache: Optional[Cache] = None):
         """
         Constructor of class "Build"
 
         :param project: single or multiple project job
+        :param cache: (optional) cache shared with the other data of the job, nothing is cached if not provided
         """
 
         self.project = project
+        self.cache = cache if cache is not None else Cache(0)
 
 
     def get(self, branch: str, id: int) -> Optional[
@@ -118,6 +122,14 @@ class Build:
         :exception BranchDatabaseException: when SQL data could not be aggregated
         """
 
+        return self.cache.get(("build", branch, str(id)), lambda: self._get(branch, id))
+
+
+    def _get(self, branch: str, id: int) -> Optional[dict[str, Union[str, int, list[dict[str, Union[str, int]]]]]]:
+        """
+        Reads the data returned by "get" from the database, bypassing the cache
+        """
+
         connection: Optional[mariadb.connection] = None
 
         try:
@@ -193,17 +205,23 @@ class Build:
         :exception BranchDatabaseException: when SQL data could not be aggregated
         """
 
+        return self.cache.get(("latest", branch), lambda: self._last(branch))
+
+
+    def _last(self, branch: str) -> Optional[dict[str, Union[str, int, list[dict[str, Union[str, int]]]]]]:
+        """
+        Reads the data returned by "last" from the database, bypassing the cache
+        """
+
         connection: Optional[mariadb.connection] = None
 
         try:
             connection = self.project.connection.get()
 
-            builds = self.project.builds.all(connection, branch)
-            if builds is None:
+            build = self.project.builds.last(connection, branch)
+            if build is None:
                 return None
 
-            build = builds[-1]
-
             if isinstance(self.project, app.sql.SingleProjectJob):
                 return build
 
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+app/data/Cache.py
+
+Copyright (C) 2021-2023, VISUS Health IT GmbH
+This software and supporting documentation were developed by
+  VISUS Health IT GmbH
+  Gesundheitscampus-Sued 15
+  D-44801 Bochum, Germany
+  http://www.visus.com
+  mailto:info@visus.com
+
+-> see LICENCE at root of repository
+"""
+
+import copy
+import threading
+import time
+
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Union
+
+
+class Cache:
+    """
+    Bounded LRU cache with time to live for the JSON data of a single job returned by "Job", "Branch" and "Build".
+    Keys are tuples where the second value is the branch name (if any), so all entries of a branch can be invalidated
+    when it is written to.
+
+    Functions:  1) get          -> returns cached data or loads it on a miss
+                2) invalidate   -> removes the data of the job and (optionally) a branch
+                3) clear        -> removes all data
+                4) stats        -> returns statistics on cache
+    """
+
+    def __init__(self, size: int = 1024, ttl: float = 60.0):
+        """
+        Constructor of class Cache
+
+        :param size: maximum number of cached entries, zero disables the cache
+        :param ttl: seconds an entry is used before it is loaded again
+        """
+
+        self.size = size
+        self.ttl = ttl
+
+        self.entries: OrderedDict[tuple[Hashable, ...], tuple[float, Any]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+
+
+    def get(self, key: tuple[Hashable, ...], load: Callable[[], Any]) -> Any:
+        """
+        Returns cached data (a copy, so it can be changed by the caller) or loads it on a miss. None is never cached!
+
+        :param key: (<kind>, <(optional) branch name>, ...)
+        :param load: loads the data when not cached, may throw exceptions which are passed on
+        :return: data
+        """
+
+        if self.size <= 0:
+            return load()
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+
+            self.misses += 1
+            generation = self.generation
+
+        value = load()
+        if value is None:
+            return None
+
+        with self.lock:
+            # data might have been written while loading, then the loaded data is possibly outdated
+            if generation == self.generation:
+                self.entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(value))
+                self.entries.move_to_end(key)
+
+                while len(self.entries) > self.size:
+                    self.entries.popitem(last=False)
+
+        return value
+
+
+    def invalidate(self, branch: Optional[str] = None):
+        """
+        Removes the data of the job (overview on all branches) and all data of a branch
+
+        :param branch: (optional) branch name, only the job data is removed when not provided
+        """
+
+        with self.lock:
+            self.generation += 1
+
+            for key in list(self.entries.keys()):
+                if len(key) == 1 or (branch is not None and key[1] == branch):
+                    del self.entries[key]
+
+
+    def clear(self):
+        """
+        Removes all data
+        """
+
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+
+
+    def stats(self) -> dict[str, Union[int, float]]:
+        """
+        Returns statistics on the cache
+
+        :return: {
+                    "size": <maximum number of entries>,
+                    "entries": <number of entries>,
+                    "hits": <number of requests answered from cache>,
+                    "misses": <number of requests loaded from database>,
+                    "hit_rate": <share of requests answered from cache>
+                }
+        """
+
+        with self.lock:
+            requests = self.hits + self.misses
+
+            return {
+                "size": self.size,
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests > 0 else 0.0
+            }
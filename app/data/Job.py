@@ -21,6 +21,7 @@ import app.sql.MultiProjectJob
 import app.sql.SingleProjectJob
 
 from typing import Optional, Union
+from app.data.Cache import Cache
 from app.sql import ConnectionException
 
 
@@ -61,14 +62,17 @@ class Job:
     Build data returned to user on REST API when accessing: http://<backend>/<project>
     """
 
-    def __init__(self, project: Union[app.sql.MultiProjectJob, app.sql.SingleProjectJob]):
+    def __init__(self, project: Union[app.sql.MultiProjectJob, app.sql.SingleProjectJob],
+                 cache: Optional[Cache] = None):
         """
         Constructor of class "Job"
 
         :param project: single or multiple project job
+        :param cache: (optional) cache shared with the other data of the job, nothing is cached if not provided
         """
 
         self.project = project
+        self.cache = cache if cache is not None else Cache(0)
 
 
     def get(self) -> dict[str, Union[dict[str, str], list[dict[str, Union[str, int]]]]]:
@@ -98,6 +102,14 @@ class Job:
         :exception JobDatabaseException: when SQL data could not be aggregated
         """
 
+        return self.cache.get(("job",), lambda: self._get())
+
+
+    def _get(self) -> dict[str, Union[dict[str, str], list[dict[str, Union[str, int]]]]]:
+        """
+        Reads the data returned by "get" from the database, bypassing the cache
+        """
+
         connection: Optional[mariadb.connection] = None
 
         try:
@@ -107,25 +119,9 @@ class Job:
                 "general": self.project.general.get(connection)
             }
 
-            branches = self.project.branches.all(connection)
+            branches = self.project.builds.ranges(connection)
             if branches is not None:
-                ret["branches"] = []
-
-                for branch in branches:
-                    builds = self.project.builds.all(connection, branch)
-                    if builds is None:
-                        continue
-
-                    ret["branches"].append(
-                        {
-                            "name": branch,
-                            "first": builds[0]["id"],
-                            "last": builds[-1]["id"]
-                        }
-                    )
-
-                if len(ret["branches"]) == 0:
-                    del ret["branches"]
+                ret["branches"] = branches
 
             return ret
         except ConnectionException as err:
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+app/data/ResultPaths.py
+
+Copyright (C) 2021-2023, VISUS Health IT GmbH
+This software and supporting documentation were developed by
+  VISUS Health IT GmbH
+  Gesundheitscampus-Sued 15
+  D-44801 Bochum, Germany
+  http://www.visus.com
+  mailto:info@visus.com
+
+-> see LICENCE at root of repository
+"""
+
+import mariadb
+import threading
+import app.sql.MultiProjectJob
+import app.sql.SingleProjectJob
+
+from collections import OrderedDict
+from typing import Optional, Union
+from app.data.Build import BuildConnectionException, BuildDatabaseException
+from app.sql import ConnectionException
+
+
+class ResultPaths:
+    """
+    In-memory map of builds to the path of their jUnit results, used when serving files of reports so only the first
+    request of a build (or the latest build of a branch) has to ask the database. Kept current by adding / removing
+    builds instead of expiring.
+
+    Functions:  1) get          -> returns build id and result path of a build or the latest build of a branch
+                2) add          -> adds a new build
+                3) remove       -> removes one or all builds of a branch
+                4) clear        -> removes all builds
+    """
+
+    def __init__(self, project: Union[app.sql.MultiProjectJob, app.sql.SingleProjectJob], size: int = 4096):
+        """
+        Constructor of class ResultPaths
+
+        :param project: single or multiple project job
+        :param size: maximum number of builds kept in memory
+        """
+
+        self.project = project
+        self.size = size
+
+        self.paths: OrderedDict[tuple[str, Optional[int]], tuple[int, str]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.generation = 0
+
+
+    def get(self, branch: str, id: Optional[int] = None) -> Optional[tuple[int, str]]:
+        """
+        Returns the result path of a build, reads it from the database when not known
+
+        :param branch: branch name
+        :param id: (optional) build id, the latest build of the branch when not provided
+        :return: (<build id>, <path for jUnit results>) or None
+        :exception BuildConnectionException: when connection could not be established
+        :exception BuildDatabaseException: when SQL data could not be read
+        """
+
+        key = (branch, id)
+
+        with self.lock:
+            path = self.paths.get(key)
+            if path is not None:
+                self.paths.move_to_end(key)
+                return path
+
+            generation = self.generation
+
+        connection: Optional[mariadb.connection] = None
+
+        try:
+            connection = self.project.connection.get()
+
+            if id is None:
+                build = self.project.builds.last(connection, branch)
+            else:
+                build = self.project.builds.get(connection, id, branch)
+        except ConnectionException as err:
+            raise BuildConnectionException(
+                f"Creating connection for project {self.project.name} failed with an exception: {err}"
+            ) from None
+        except mariadb.Error as err:
+            raise BuildDatabaseException(
+                f"Reading SQL data for project {self.project.name} failed with an exception: {err}"
+            ) from None
+        finally:
+            if connection is not None:
+                connection.close()
+
+        if build is None:
+            return None
+
+        path = (build["id"] if id is None else id, build["result_path"])
+
+        with self.lock:
+            # builds might have been removed while reading, then the path is possibly outdated
+            if generation == self.generation:
+                self._put(key, path)
+
+        return path
+
+
+    def add(self, branch: str, id: int, result_path: str):
+        """
+        Adds a new build, it becomes the latest build of the branch when having the highest build id
+
+        :param branch: branch name
+        :param id: build id
+        :param result_path: path for jUnit results
+        """
+
+        with self.lock:
+            self.generation += 1
+
+            latest = self.paths.pop((branch, None), None)
+            if latest is not None and latest[0] > id:
+                self._put((branch, None), latest)
+            elif latest is not None:
+                self._put((branch, None), (id, result_path))
+
+            self._put((branch, id), (id, result_path))
+
+
+    def remove(self, branch: str, id: Optional[int] = None):
+        """
+        Removes a build or all builds of a branch, the latest build of the branch is read again when requested
+
+        :param branch: branch name
+        :param id: (optional) build id, all builds of the branch when not provided
+        """
+
+        with self.lock:
+            self.generation += 1
+
+            for key in list(self.paths.keys()):
+                if key[0] == branch and (id is None or key[1] is None or key[1] == id):
+                    del self.paths[key]
+
+
+    def clear(self):
+        """
+        Removes all builds
+        """
+
+        with self.lock:
+            self.generation += 1
+            self.paths.clear()
+
+
+    def _put(self, key: tuple[str, Optional[int]], path: tuple[int, str]):
+        """
+        Stores a result path, the least recently used ones are forgotten when exceeding the size (lock must be held)
+
+        :param key: (<branch name>, <build id or None for latest>)
+        :param path: (<build id>, <path for jUnit results>)
+        """
+
+        self.paths[key] = path
+        self.paths.move_to_end(key)
+
+        while len(self.paths) > self.size:
+            self.paths.popitem(last=False)
@@ -17,4 +17,6 @@ This software and supporting documentation were developed by
 
 from .Branch import BranchConnectionException, BranchDatabaseException, Branch
 from .Build import BuildConnectionException, BuildDatabaseException, Build
+from .Cache import Cache
 from .Job import JobConnectionException, JobDatabaseException, Job
+from .ResultPaths import ResultPaths
@@ -16,8 +16,14 @@ This software and supporting documentation were developed by
 """
 
 import mariadb
+import threading
 
 from dataclasses import dataclass
+from typing import Any, Callable, Optional, Union
+
+
+# error number of the database when a row with the same (primary) key already exists
+ER_DUP_ENTRY = 1062
 
 
 class ConnectionException(Exception):
@@ -49,6 +55,214 @@ class ConnectionInfo:
     user: str
     password: str
     database: str
+    pool_size: int = 0              # number of pooled connections shared with all jobs on the server, zero disables
+    pool_timeout: float = 5.0       # seconds to wait for a free pooled connection
+    pool_validation: int = 500      # milliseconds a pooled connection can be idle before it is checked when reused
+    connect_timeout: int = 5        # seconds to wait for a new connection to be established
+
+
+class PooledConnection:
+    """
+    Connection handed out by the pool, behaves like the MariaDB connection it wraps. Closing it returns the connection
+    to the pool and frees its slot for the next one waiting
+    """
+
+    def __init__(self, connection: mariadb.connection, release: Callable[[], None]):
+        """
+        Constructor of class PooledConnection
+
+        :param connection: MariaDB connection taken from the pool
+        :param release: called once when the connection is closed
+        """
+
+        object.__setattr__(self, "_connection", connection)
+        object.__setattr__(self, "_release", release)
+
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._connection, name)
+
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._connection, name, value)
+
+
+    def close(self):
+        """
+        Returns the connection to the pool, closing it more than once has no effect
+        """
+
+        release = self._release
+        if release is None:
+            return
+
+        object.__setattr__(self, "_release", None)
+        try:
+            self._connection.close()
+        finally:
+            release()
+
+
+class ConnectionPool:
+    """
+    Pool of MariaDB connections to one database server shared by all jobs, the database (schema) of a job is selected
+    every time a connection is handed out. A connection is returned to the pool when it is closed.
+
+    Functions:  1) shared       -> returns the pool for a database server, creates it when not existing
+                2) get          -> returns a free connection from the pool
+                3) stats        -> returns statistics on the pool
+                4) close        -> closes all connections of the pool
+    """
+
+    pools: dict[tuple[str, int, str], "ConnectionPool"] = {}
+    pools_lock = threading.Lock()
+
+
+    @classmethod
+    def shared(cls, info: ConnectionInfo) -> "ConnectionPool":
+        """
+        Returns the pool for the database server / user of the connection information, the first job using a server
+        determines the size and timeouts of the pool
+
+        :param info: connection information
+        :return: pool shared by all jobs using the same database server / user
+        """
+
+        key = (info.host, info.port, info.user)
+
+        with cls.pools_lock:
+            if key not in cls.pools:
+                cls.pools[key] = cls(info)
+
+            return cls.pools[key]
+
+
+    def __init__(self, info: ConnectionInfo):
+        """
+        Constructor of class ConnectionPool, connections are only established when first used
+
+        :param info: connection information (database is ignored)
+        """
+
+        self.info = info
+        self.pool: Optional[mariadb.ConnectionPool] = None
+        self.lock = threading.Lock()
+
+        # one slot per connection of the pool, requests wait for a slot instead of polling the pool
+        self.free = threading.BoundedSemaphore(max(info.pool_size, 1))
+
+        self.acquired = 0
+        self.waited = 0
+        self.timeouts = 0
+
+
+    def get(self, database: str) -> mariadb.connection:
+        """
+        Returns a free connection from the pool, waits for one to be returned when all are in use
+
+        :param database: database (schema) to be used by the connection
+        :return: connection object
+        :exception ConnectionException: when connection could not be established or none was free in time
+        """
+
+        waited = not self.free.acquire(blocking=False)
+        if waited and not self.free.acquire(timeout=self.info.pool_timeout):
+            with self.lock:
+                self.timeouts += 1
+            raise ConnectionException(
+                f"No free database connection for project '{database}' within {self.info.pool_timeout} seconds"
+            )
+
+        try:
+            connection = self._pool().get_connection()
+        except mariadb.Error as err:
+            self.free.release()
+            raise ConnectionException(
+                f"Getting database connection from pool for project '{database}' threw an exception"
+            ) from err
+
+        if connection is None:
+            self.free.release()
+            raise ConnectionException(f"No free database connection for project '{database}' in pool")
+
+        with self.lock:
+            self.acquired += 1
+            if waited:
+                self.waited += 1
+
+        connection = PooledConnection(connection, self.free.release)
+        try:
+            if connection.database != database:
+                cursor = connection.cursor()
+                cursor.execute("USE `" + database.replace("`", "``") + "`")
+                cursor.close()
+            connection.autocommit = False
+        except mariadb.Error as err:
+            connection.close()
+            raise ConnectionException(
+                f"Switching database connection to project '{database}' threw an exception"
+            ) from err
+
+        return connection
+
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns statistics on the pool
+
+        :return: {
+                    "size": <maximum number of connections>,
+                    "open": <number of established connections>,
+                    "acquired": <number of connections handed out>,
+                    "waited": <number of connections only handed out after waiting for a free one>,
+                    "timeouts": <number of requests where no connection was free in time>
+                }
+        """
+
+        with self.lock:
+            return {
+                "size": self.info.pool_size,
+                "open": self.pool.connection_count if self.pool is not None else 0,
+                "acquired": self.acquired,
+                "waited": self.waited,
+                "timeouts": self.timeouts
+            }
+
+
+    def close(self):
+        """
+        Closes all connections of the pool, it is re-created when used again
+        """
+
+        with self.lock:
+            if self.pool is not None:
+                self.pool.close()
+                self.pool = None
+
+
+    def _pool(self) -> mariadb.ConnectionPool:
+        """
+        Returns the MariaDB connection pool, creates it when not existing
+
+        :return: MariaDB connection pool
+        :exception mariadb.Error: when pool could not be created
+        """
+
+        with self.lock:
+            if self.pool is None:
+                self.pool = mariadb.ConnectionPool(
+                    pool_name=f"jUnitReportsIndex-{self.info.host}-{self.info.port}-{self.info.user}",
+                    pool_size=self.info.pool_size,
+                    pool_reset_connection=True,
+                    pool_validation_interval=self.info.pool_validation,
+                    host=self.info.host,
+                    port=self.info.port,
+                    user=self.info.user,
+                    password=self.info.password,
+                    connect_timeout=self.info.connect_timeout
+                )
+
+            return self.pool
 
 
 class Connection:
@@ -64,23 +278,32 @@ class Connection:
         """
 
         self.info = info
+        self.pool = ConnectionPool.shared(info) if info.pool_size > 0 else None
+        self.acquired = 0
 
 
     def get(self) -> mariadb.connection:
         """
-        Returns a MariaDB connection to the current database
+        Returns a MariaDB connection to the current database, taken from the shared pool when pooling is used.
+        Closing the connection returns it to the pool!
 
         :return: connection object
-        :exception mariadb.Error: when connection could not be established
+        :exception ConnectionException: when connection could not be established
         """
 
+        if self.pool is not None:
+            connection = self.pool.get(self.info.database)
+            self.acquired += 1
+            return connection
+
         try:
             connection = mariadb.connect(
                 host=self.info.host,
                 port=self.info.port,
                 user=self.info.user,
                 password=self.info.password,
-                database=self.info.database
+                database=self.info.database,
+                connect_timeout=self.info.connect_timeout
             )
             connection.autocommit = False
         except mariadb.Error as err:
@@ -89,3 +312,31 @@ class Connection:
             ) from err
 
         return connection
+
+
+    def stats(self) -> Optional[dict[str, Union[int, dict[str, int]]]]:
+        """
+        Returns statistics on the connection pool
+
+        :return: {
+                    "acquired": <number of pooled connections handed out for this database>,
+                    "pool": <see "ConnectionPool.stats" of shared pool>
+                } or None when no pooling is used
+        """
+
+        if self.pool is None:
+            return None
+
+        return {
+            "acquired": self.acquired,
+            "pool": self.pool.stats()
+        }
+
+
+    def close(self):
+        """
+        Closes all pooled connections (if pooling is used), this affects all jobs sharing the pool
+        """
+
+        if self.pool is not None:
+            self.pool.close()
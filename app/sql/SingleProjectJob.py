@@ -15,6 +15,9 @@ This software and supporting documentation were developed by
 -> see LICENCE at root of repository
 """
 
+import mariadb
+
+from typing import Optional
 from app.sql.tables import Branches, Builds, GeneralInformation
 from .Connection import *
 
@@ -24,6 +27,8 @@ class SingleProjectJob:
     Database connection to a MariaDB database for a single project build
 
     Functions:  1) connection.get       -> connection to database
+                2) addBuild             -> add a whole build in a single transaction
+                3) pruneBuilds          -> remove old builds of a branch in a single transaction
 
     Tables:     1) GeneralInformation   -> general information on single project job
                 2) Branches             -> information on job branches
@@ -42,3 +47,78 @@ class SingleProjectJob:
         self.general = GeneralInformation()
         self.branches = Branches()
         self.builds = Builds()
+
+
+    def addBuild(self, con: mariadb.connection, id: int, branch: str, gCommit: str, version: Optional[str],
+                 rc: Optional[str], tests_success: int, tests_skipped: int, tests_flaky: int, tests_failed: int,
+                 type: Optional[str], result_path: str):
+        """
+        Adds a new build together with its branch in a single transaction, already existing
+        branches are skipped
+
+        :param con: connection to database
+        :param id: build id
+        :param branch: Git branch
+        :param gCommit: Git commit hash
+        :param version: (optional) project version
+        :param rc: (optional) project release candidate
+        :param tests_success: number of successful tests
+        :param tests_skipped: number of skipped tests
+        :param tests_flaky: number of flaky tests
+        :param tests_failed: number of failed tests
+        :param type: (optional) build type
+        :param result_path: path for jUnit results
+        :exception mariadb.Error: when errors with the database connection occurred (e.g. build already exists),
+                                  the transaction is rolled back in this case
+        """
+
+        try:
+            self.branches.addMany(con, [branch])
+            self.builds.addMany(
+                con, [
+                    {
+                        "id": id, "branch": branch, "gCommit": gCommit, "version": version, "rc": rc,
+                        "tests_success": tests_success, "tests_skipped": tests_skipped, "tests_flaky": tests_flaky,
+                        "tests_failed": tests_failed, "type": type, "result_path": result_path
+                    }
+                ]
+            )
+
+            con.commit()
+        except mariadb.Error:
+            con.rollback()
+            raise
+
+
+    def pruneBuilds(self, con: mariadb.connection, branch: str, keep: Optional[int] = None,
+                    expired: Optional[int] = None) -> list[tuple[int, str]]:
+        """
+        Deletes old builds of a branch in a single transaction, the latest build is always kept
+
+        :param con: connection to database
+        :param branch: Git branch
+        :param keep: (optional) number of latest builds to keep (at least one)
+        :param expired: (optional) build id, all older builds are deleted as well
+        :return: deleted builds, see "Builds.prune"
+        :exception mariadb.Error: when errors with the database connection occurred, the transaction is rolled back
+                                  in this case
+        """
+
+        try:
+            before = self.builds.cutoff(con, branch, keep) if keep is not None else None
+            if expired is not None:
+                latest = self.builds.cutoff(con, branch, 1)
+                if latest is not None:
+                    before = max(before, min(expired, latest)) if before is not None else min(expired, latest)
+
+            if before is None:
+                con.rollback()
+                return []
+
+            builds = self.builds.prune(con, branch, before)
+
+            con.commit()
+            return builds
+        except mariadb.Error:
+            con.rollback()
+            raise
@@ -17,7 +17,7 @@ This software and supporting documentation were developed by
 
 import mariadb
 
-from typing import Any, Optional
+from typing import Any, Optional, Union
 
 
 class Builds:
@@ -26,11 +26,19 @@ class Builds:
 
     Functions:  1) create       -> create table if not already exists in database
                 2) add          -> add information on new build
-                3) get          -> returns information regarding specific build
-                4) all          -> returns information regarding all builds of a branch
-                5) cnt          -> returns number of rows in table of a branch
-                6) rem          -> remove build from table
-                7) delete       -> delete table
+                3) addMany      -> add information on multiple new builds (without commit)
+                4) get          -> returns information regarding specific build
+                5) last         -> returns information regarding the latest build of a branch
+                6) all          -> returns information regarding all builds of a branch
+                7) ids          -> returns (a page of) the build ids of a branch
+                8) range        -> returns smallest and highest build id of a branch
+                9) ranges       -> returns smallest and highest build id of all branches
+               10) paths        -> returns the path for jUnit results of all builds
+               11) cnt          -> returns number of rows in table of a branch
+               12) cutoff       -> returns the smallest build id to keep of a branch
+               13) rem          -> remove build from table
+               14) prune        -> remove all builds of a branch older than a build id (without commit)
+               15) delete       -> delete table
     """
 
     def create(self, con: mariadb.connection):
@@ -117,6 +125,50 @@ class Builds:
         return True
 
 
+    def addMany(self, con: mariadb.connection, builds: list[dict[str, Any]]):
+        """
+        Creates multiple new builds in one statement. Does not commit so it can be part of a bigger transaction!
+
+        :param con: connection to database
+        :param builds: [
+                    {
+                        "id": <build id>,
+                        "branch": <Git branch>,
+                        "gCommit": <Git commit hash>,
+                        "version": <(optional) project version>,
+                        "rc": <(optional) project release candidate>,
+                        "tests_success": <number of successful tests>,
+                        "tests_skipped": <number of skipped tests>,
+                        "tests_flaky": <number of flaky tests>,
+                        "tests_failed": <number of failed tests>,
+                        "type": <(optional) build type>,
+                        "result_path": <path for jUnit results>
+                    },
+                    ...
+                ]
+        :exception mariadb.Error: when errors with the database connection occurred (e.g. build already exists)
+        """
+
+        if len(builds) == 0:
+            return
+
+        cursor = con.cursor()
+        cursor.executemany(
+            "INSERT INTO Builds \
+                (id, branch, gCommit, version, rc, tests_success, tests_skipped, tests_flaky, tests_failed, type, \
+                result_path) \
+            VALUES \
+                (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    build["id"], build["branch"], build["gCommit"], build["version"], build["rc"],
+                    build["tests_success"], build["tests_skipped"], build["tests_flaky"], build["tests_failed"],
+                    build["type"], build["result_path"],
+                ) for build in builds
+            ]
+        )
+
+
     def get(self, con: mariadb.connection, id: int, branch: str) -> Optional[dict[str, Any]]:
         """
         Returns information on a distinct build of a specific branch
@@ -167,6 +219,60 @@ class Builds:
         }
 
 
+    def last(self, con: mariadb.connection, branch: str) -> Optional[dict[str, Any]]:
+        """
+        Returns information on the latest build (highest build id) of a specific branch
+
+        :param con: connection to database
+        :param branch: branch name
+        :return:
+                {
+                    "id": &lt;build id>,
+                    "gCommit": &lt;Git commit hash>,
+                    "version": &lt;(optional) project version>,
+                    "rc": &lt;(optional) project release candidate>,
+                    "tests_success": &lt;number of successful tests>,
+                    "tests_skipped": &lt;number of skipped tests>,
+                    "tests_flaky": &lt;number of flaky tests>,
+                    "tests_failed": &lt;number of failed tests>,
+                    "type": &lt;(optional) build type>,
+                    "result_path": &lt;path for jUnit results>,
+                } or None
+        :exception mariadb.Error: when errors with the database connection occurred
+        """
+
+        cursor = con.cursor()
+        cursor.execute(
+            "SELECT \
+                id, gCommit, version, rc, tests_success, tests_skipped, tests_flaky, tests_failed, type, result_path \
+            FROM \
+                Builds \
+            WHERE \
+                branch=? \
+            ORDER BY \
+                id DESC \
+            LIMIT 1",
+            (branch,)
+        )
+        row = cursor.fetchone()
+
+        if not row:
+            return None
+
+        return {
+            "id": row[0],
+            "gCommit": row[1],
+            "version": row[2],
+            "rc": row[3],
+            "tests_success": row[4],
+            "tests_skipped": row[5],
+            "tests_flaky": row[6],
+            "tests_failed": row[7],
+            "type": row[8],
+            "result_path": row[9]
+        }
+
+
     def all(self, con: mariadb.connection, branch: str) -> Optional[list[dict[str, Any]]]:
         """
         Returns base information on all builds of a specific branch
@@ -224,6 +330,139 @@ class Builds:
         ]
 
 
+    def ids(self, con: mariadb.connection, branch: str, after: Optional[int] = None,
+            limit: Optional[int] = None) -> list[int]:
+        """
+        Returns the build ids of a specific branch in ascending order, only the ids are read so this stays cheap on
+        branches with a long history. Can be paged through using the last id returned as "after" for the next page
+
+        :param con: connection to database
+        :param branch: branch name
+        :param after: (optional) only build ids higher than this one
+        :param limit: (optional) maximum number of build ids
+        :return: [
+                    &lt;build id>,
+                    ...
+                 ]
+        :exception mariadb.Error: when errors with the database connection occurred
+        """
+
+        query = "SELECT \
+                    id \
+                FROM \
+                    Builds \
+                WHERE \
+                    branch=?"
+        params: list[Union[str, int]] = [branch]
+
+        if after is not None:
+            query += " AND id>?"
+            params.append(after)
+
+        query += " ORDER BY id ASC"
+
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        cursor = con.cursor()
+        cursor.execute(query, tuple(params))
+
+        return [row[0] for row in cursor.fetchall()]
+
+
+    def range(self, con: mariadb.connection, branch: str) -> Optional[tuple[int, int]]:
+        """
+        Returns the smallest and highest build id of a specific branch
+
+        :param con: connection to database
+        :param branch: branch name
+        :return: (&lt;smallest build id>, &lt;highest build id>) or None
+        :exception mariadb.Error: when errors with the database connection occurred
+        """
+
+        cursor = con.cursor()
+        cursor.execute(
+            "SELECT \
+                MIN(id), MAX(id) \
+            FROM \
+                Builds \
+            WHERE \
+                branch=?",
+            (branch,)
+        )
+        row = cursor.fetchone()
+
+        if not row or row[0] is None:
+            return None
+
+        return row[0], row[1]
+
+
+    def ranges(self, con: mariadb.connection) -> Optional[list[dict[str, Any]]]:
+        """
+        Returns the smallest and highest build id of all branches having builds in one query
+
+        :param con: connection to database
+        :return: [
+                    {
+                        "name": &lt;branch name>,
+                        "first": &lt;smallest build id>,
+                        "last": &lt;highest build id>
+                    },
+                    ...
+                 ] or None
+        :exception mariadb.Error: when errors with the database connection occurred
+        """
+
+        cursor = con.cursor()
+        cursor.execute(
+            "SELECT \
+                branch, MIN(id), MAX(id) \
+            FROM \
+                Builds \
+            GROUP BY \
+                branch \
+            ORDER BY \
+                branch ASC"
+        )
+        rows = cursor.fetchall()
+
+        if len(rows) == 0:
+            return None
+
+        return [
+            {
+                "name": row[0],
+                "first": row[1],
+                "last": row[2]
+            } for row in rows
+        ]
+
+
+    def paths(self, con: mariadb.connection) -> list[tuple[str, int, str]]:
+        """
+        Returns the path for jUnit results of all builds of all branches in one query
+
+        :param con: connection to database
+        :return: [
+                    (&lt;branch name>, &lt;build id>, &lt;path for jUnit results>),
+                    ...
+                 ]
+        :exception mariadb.Error: when errors with the database connection occurred
+        """
+
+        cursor = con.cursor()
+        cursor.execute(
+            "SELECT \
+                branch, id, result_path \
+            FROM \
+                Builds"
+        )
+
+        return [(row[0], row[1], row[2]) for row in cursor.fetchall()]
+
+
     def cnt(self, con: mariadb.connection, branch: str):
         """
         Returns the number of all builds of a specific branch
@@ -247,6 +486,38 @@ class Builds:
         return cursor.fetchone()[0]
 
 
+    def cutoff(self, con: mariadb.connection, branch: str, keep: int) -> Optional[int]:
+        """
+        Returns the smallest build id of the latest builds of a specific branch to be kept
+
+        :param con: connection to database
+        :param branch: branch name
+        :param keep: number of latest builds to keep (at least one)
+        :return: build id or None when branch has no more builds than to be kept
+        :exception mariadb.Error: when errors with the database connection occurred
+        """
+
+        cursor = con.cursor()
+        cursor.execute(
+            "SELECT \
+                id \
+            FROM \
+                Builds \
+            WHERE \
+                branch=? \
+            ORDER BY \
+                id DESC \
+            LIMIT 1 OFFSET ?",
+            (branch, keep - 1,)
+        )
+        row = cursor.fetchone()
+
+        if not row:
+            return None
+
+        return row[0]
+
+
     def rem(self, con: mariadb.connection, id: Optional[int], branch: str):
         """
         Deletes a distinct branch
@@ -277,6 +548,45 @@ class Builds:
         con.commit()
 
 
+    def prune(self, con: mariadb.connection, branch: str, before: int) -> list[tuple[int, str]]:
+        """
+        Deletes all builds of a specific branch older than a build id in one statement. Does not commit so it can be
+        part of a bigger transaction!
+
+        :param con: existing connection to database
+        :param branch: branch name
+        :param before: build id, all builds with smaller ids are deleted
+        :return: [
+                    (&lt;build id>, &lt;path for jUnit results>),
+                    ...
+                 ]
+        :exception mariadb.Error: when errors with the database connection occurred
+        """
+
+        cursor = con.cursor()
+        cursor.execute(
+            "SELECT \
+                id, result_path \
+            FROM \
+                Builds \
+            WHERE \
+                branch=? AND id<? \
+            FOR UPDATE",
+            (branch, before,)
+        )
+        rows = cursor.fetchall()
+
+        cursor.execute(
+            "DELETE FROM \
+                Builds \
+            WHERE \
+                branch=? AND id<?",
+            (branch, before,)
+        )
+
+        return [(row[0], row[1]) for row in rows]
+
+
     def delete(self, con: mariadb.connection):
         """
         Deletes the table "Builds" in database provided using connection
@@ -26,10 +26,11 @@ class Subprojects:
 
     Functions:  1) create       -> create table if not already exists in database
                 2) add          -> add information on new subproject
-                3) all          -> returns information regarding all subprojects
-                4) cnt          -> returns number of rows in table
-                5) rem          -> remove subproject from table
-                6) delete       -> delete table
+                3) addMany      -> add information on multiple subprojects (without commit)
+                4) all          -> returns information regarding all subprojects
+                5) cnt          -> returns number of rows in table
+                6) rem          -> remove subproject from table
+                7) delete       -> delete table
     """
 
     def create(self, con: mariadb.connection):
@@ -89,6 +90,31 @@ class Subprojects:
         return True
 
 
+    def addMany(self, con: mariadb.connection, names: list[str]):
+        """
+        Creates multiple subprojects in one statement, already existing ones are skipped. Does not commit so it can be
+        part of a bigger transaction!
+
+        :param con: connection to database
+        :param names: subproject names
+        :exception mariadb.Error: when errors with the database connection occurred
+        """
+
+        if len(names) == 0:
+            return
+
+        cursor = con.cursor()
+        cursor.executemany(
+            "INSERT INTO Subprojects \
+                (name) \
+            VALUES \
+                (?) \
+            ON DUPLICATE KEY UPDATE \
+                name=name",
+            [(name,) for name in names]
+        )
+
+
     def all(self, con: mariadb.connection) -> Optional[list]:
         """
         Returns base information on all subproject
@@ -26,11 +26,13 @@ class Subprojects_in_Build:
 
     Functions:  1) create       -> create table if not already exists in database
                 2) add          -> add information on new build
-                3) get          -> returns information regarding specific build
-                4) all          -> returns information regarding all builds of a branch
-                5) cnt          -> returns number of rows in table of a branch
-                6) rem          -> remove combination from table
-                7) delete       -> delete table
+                3) addMany      -> add information on multiple subprojects of a build (without commit)
+                4) get          -> returns information regarding specific build
+                5) all          -> returns information regarding all builds of a branch
+                6) cnt          -> returns number of rows in table of a branch
+                7) rem          -> remove combination from table
+                8) prune        -> remove combinations of all builds of a branch older than a build id (without commit)
+                9) delete       -> delete table
     """
 
     def create(self, con: mariadb.connection):
@@ -110,6 +112,51 @@ class Subprojects_in_Build:
         return True
 
 
+    def addMany(self, con: mariadb.connection, branch: str, id: int, subprojects: list[dict[str, Any]]):
+        """
+        Creates multiple new combinations of one build in one statement, already existing ones are skipped. Does not
+        commit so it can be part of a bigger transaction!
+
+        :param con: connection to database
+        :param branch: Git branch
+        :param id: build id
+        :param subprojects: [
+                    {
+                        "subproject": <subproject name>,
+                        "tests_success": <number of successful tests>,
+                        "tests_skipped": <number of skipped tests>,
+                        "tests_flaky": <number of flaky tests>,
+                        "tests_failed": <number of failed tests>,
+                        "result_url": <URL of test result index.html>,
+                        "duration": <time it took to test>
+                    },
+                    ...
+                ]
+        :exception mariadb.Error: when errors with the database connection occurred
+        """
+
+        if len(subprojects) == 0:
+            return
+
+        cursor = con.cursor()
+        cursor.executemany(
+            "INSERT INTO Subprojects_in_Build \
+                (branch, id, subproject, tests_success, tests_skipped, tests_flaky, tests_failed, result_url, \
+                duration) \
+            VALUES \
+                (?, ?, ?, ?, ?, ?, ?, ?, ?) \
+            ON DUPLICATE KEY UPDATE \
+                subproject=subproject",
+            [
+                (
+                    branch, id, subproject["subproject"], subproject["tests_success"], subproject["tests_skipped"],
+                    subproject["tests_flaky"], subproject["tests_failed"], subproject["result_url"],
+                    subproject["duration"],
+                ) for subproject in subprojects
+            ]
+        )
+
+
     def get(self, con: mariadb.connection, branch: str, id: int, subproject: str) -> Optional[dict[str, Any]]:
         """
         Returns a specific combination
@@ -259,6 +306,27 @@ class Subprojects_in_Build:
         con.commit()
 
 
+    def prune(self, con: mariadb.connection, branch: str, before: int):
+        """
+        Deletes the combinations of all builds of a specific branch older than a build id in one statement. Does not
+        commit so it can be part of a bigger transaction!
+
+        :param con: existing connection to database
+        :param branch: branch name
+        :param before: build id, combinations of all builds with smaller ids are deleted
+        :exception mariadb.Error: when errors with the database connection occurred
+        """
+
+        cursor = con.cursor()
+        cursor.execute(
+            "DELETE FROM \
+                Subprojects_in_Build \
+            WHERE \
+                branch=? AND id<?",
+            (branch, before,)
+        )
+
+
     def delete(self, con: mariadb.connection):
         """
         Deletes the table "Builds" in database provided using connection
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+app/util/Archive.py
+
+Copyright (C) 2021-2023, VISUS Health IT GmbH
+This software and supporting documentation were developed by
+  VISUS Health IT GmbH
+  Gesundheitscampus-Sued 15
+  D-44801 Bochum, Germany
+  http://www.visus.com
+  mailto:info@visus.com
+
+-> see LICENCE at root of repository
+"""
+
+import mmap
+import threading
+import zipfile
+
+from collections import OrderedDict
+from typing import Optional
+
+
+class _MappedFile(mmap.mmap):
+    """
+    Memory-mapped file that can be used as file object by "zipfile.ZipFile"
+    """
+
+    def seekable(self) -> bool:
+        """
+        Memory-mapped files can always be seeked
+
+        :return: True
+        """
+
+        return True
+
+
+class Archives:
+    """
+    ZIP archives of builds (storage mode "archive") opened lazily and kept open and memory-mapped, so files are read
+    using the central directory without extracting them. The least recently used archives are closed.
+
+    Functions:  1) get          -> returns opened archive of a build
+                2) forget       -> closes archives of builds
+                3) clear        -> closes all archives
+    """
+
+    def __init__(self, size: int = 64):
+        """
+        Constructor of class Archives
+
+        :param size: maximum number of archives kept open
+        """
+
+        self.size = size
+        self.archives: OrderedDict[str, zipfile.ZipFile] = OrderedDict()
+        self.lock = threading.Lock()
+
+
+    def get(self, path: str) -> Optional[zipfile.ZipFile]:
+        """
+        Returns the opened archive of a build
+
+        :param path: path of the ZIP archive of the build
+        :return: archive or None when it could not be opened
+        """
+
+        with self.lock:
+            if path in self.archives:
+                self.archives.move_to_end(path)
+                return self.archives[path]
+
+        try:
+            with open(path, "rb") as f:
+                data = _MappedFile(f.fileno(), 0, access=mmap.ACCESS_READ)
+            archive = zipfile.ZipFile(data, "r")
+        except (OSError, ValueError, zipfile.BadZipFile):
+            return None
+
+        with self.lock:
+            if path in self.archives:
+                archive.close()
+                data.close()
+                return self.archives[path]
+
+            self.archives[path] = archive
+            while len(self.archives) > self.size:
+                _, oldest = self.archives.popitem(last=False)
+                _close(oldest)
+
+            return archive
+
+
+    def forget(self, prefix: str):
+        """
+        Closes archives (e.g. before they are deleted)
+
+        :param prefix: path of the ZIP archive of a build or a parent directory (e.g. of a branch)
+        """
+
+        with self.lock:
+            for path in list(self.archives.keys()):
+                if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                    _close(self.archives.pop(path))
+
+
+    def clear(self):
+        """
+        Closes all archives
+        """
+
+        with self.lock:
+            while len(self.archives) > 0:
+                _, archive = self.archives.popitem()
+                _close(archive)
+
+
+def _close(archive: zipfile.ZipFile):
+    """
+    Closes an archive, its memory-mapped file is not closed explicitly but unmapped once files currently read from it
+    are closed too
+
+    :param archive: archive opened by "Archives.get"
+    """
+
+    archive.close()
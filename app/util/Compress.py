@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+app/util/Compress.py
+
+Copyright (C) 2021-2023, VISUS Health IT GmbH
+This software and supporting documentation were developed by
+  VISUS Health IT GmbH
+  Gesundheitscampus-Sued 15
+  D-44801 Bochum, Germany
+  http://www.visus.com
+  mailto:info@visus.com
+
+-> see LICENCE at root of repository
+"""
+
+import gzip
+import os
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# file extension of precompressed variants (also order of preference when serving)
+ENCODINGS = {
+    "br": ".br",
+    "gzip": ".gz"
+}
+
+# only the web assets of the reports served to browsers, not the jUnit XML results or other text files
+COMPRESSIBLE = (".html", ".htm", ".css", ".js")
+
+
+def _compressors() -> dict[str, Callable[[bytes], bytes]]:
+    """
+    Returns the compressors available
+
+    :return: {<encoding>: <function compressing data>, ...}, brotli only when package is installed
+    """
+
+    ret = {
+        "gzip": lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    }
+
+    if brotli is not None:
+        ret["br"] = lambda data: brotli.compress(data, quality=11)
+
+    return ret
+
+
+def precompressFile(path: str, min_size: int = 1024) -> int:
+    """
+    Writes the precompressed variants (e.g. "index.html.gz") of a file, only if they are smaller than the file itself
+
+    :param path: file to compress
+    :param min_size: files smaller than this (in bytes) are not compressed
+    :return: number of variants written
+    """
+
+    if not path.lower().endswith(COMPRESSIBLE) or os.path.getsize(path) < min_size:
+        return 0
+
+    with open(path, "rb") as f:
+        data = f.read()
+
+    ret = 0
+    for encoding, compress in _compressors().items():
+        compressed = compress(data)
+        if len(compressed) >= len(data):
+            continue
+
+        # variants only appear complete, they might be served right away
+        with open(path + ENCODINGS[encoding] + ".tmp", "wb") as f:
+            f.write(compressed)
+        os.replace(path + ENCODINGS[encoding] + ".tmp", path + ENCODINGS[encoding])
+        ret += 1
+
+    return ret
+
+
+class Precompressor:
+    """
+    Writes precompressed variants of the report files of new builds in the background, can be shared by all jobs
+
+    Functions:  1) submit       -> compress all files of a build
+                2) stop         -> stop after current builds
+                3) stats        -> returns statistics on compressor
+    """
+
+    def __init__(self, workers: int = 1, min_size: int = 1024):
+        """
+        Constructor of class Precompressor
+
+        :param workers: number of threads compressing files
+        :param min_size: files smaller than this (in bytes) are not compressed
+        """
+
+        self.workers = workers
+        self.min_size = min_size
+
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="Precompressor")
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.files = 0
+
+
+    def submit(self, path: str, done: Optional[Callable[[str], Any]] = None):
+        """
+        Compresses all files of a build in the background
+
+        :param path: path of the build data
+        :param done: (optional) called with the path after all files were compressed
+        """
+
+        with self.lock:
+            self.queued += 1
+
+        try:
+            self.executor.submit(self._compress, path, done)
+        except RuntimeError:
+            # already stopped, the files are served uncompressed
+            with self.lock:
+                self.queued -= 1
+
+
+    def stop(self):
+        """
+        Stops after the builds currently compressed, the others are not compressed
+        """
+
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns statistics on the compressor
+
+        :return: {
+                    "workers": <number of threads>,
+                    "queued": <number of builds not compressed yet>,
+                    "files": <number of precompressed variants written>
+                }
+        """
+
+        with self.lock:
+            return {
+                "workers": self.workers,
+                "queued": self.queued,
+                "files": self.files
+            }
+
+
+    def _compress(self, path: str, done: Optional[Callable[[str], Any]]):
+        """
+        Compresses all files of a build, a build deleted meanwhile is skipped
+
+        :param path: path of the build data
+        :param done: (optional) called with the path after all files were compressed
+        """
+
+        files = 0
+
+        try:
+            for root, _, names in os.walk(path):
+                for name in names:
+                    try:
+                        files += precompressFile(os.path.join(root, name), self.min_size)
+                    except OSError:
+                        continue
+
+            if done is not None and files > 0:
+                done(path)
+        finally:
+            with self.lock:
+                self.queued -= 1
+                self.files += files
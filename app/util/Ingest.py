@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+app/util/Ingest.py
+
+Copyright (C) 2021-2023, VISUS Health IT GmbH
+This software and supporting documentation were developed by
+  VISUS Health IT GmbH
+  Gesundheitscampus-Sued 15
+  D-44801 Bochum, Germany
+  http://www.visus.com
+  mailto:info@visus.com
+
+-> see LICENCE at root of repository
+"""
+
+import cherrypy
+import http
+import queue
+import threading
+import time
+import uuid
+
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+
+class IngestQueueFullException(Exception):
+    """
+    Exception thrown when no more uploads can be queued
+    """
+
+    def __init__(self, message: str):
+        """
+        Constructor of class IngestQueueFullException
+
+        :param message: error message
+        """
+
+        super(IngestQueueFullException, self).__init__(message)
+        self.message = message
+
+
+class IngestDuplicateException(Exception):
+    """
+    Exception thrown when the same build is already queued / processed
+    """
+
+    def __init__(self, message: str):
+        """
+        Constructor of class IngestDuplicateException
+
+        :param message: error message
+        """
+
+        super(IngestDuplicateException, self).__init__(message)
+        self.message = message
+
+
+class IngestTicket:
+    """
+    State of a single upload processed in the background
+    """
+
+    def __init__(self, job: str, location: str, id: Optional[str] = None):
+        """
+        Constructor of class IngestTicket
+
+        :param job: job name
+        :param location: URL of the build once it was added
+        :param id: (optional) ticket id, e.g. of an upload queued again after restarting, a new one if not provided
+        """
+
+        self.id = id if id is not None else uuid.uuid4().hex
+        self.job = job
+        self.location = location
+        self.status = "queued"
+        self.code = None
+        self.created = time.time()
+        self.finished = threading.Event()
+
+
+    def finish(self, code: int):
+        """
+        Marks the ticket as finished
+
+        :param code: HTTP status code the upload would have had when processed synchronously
+        """
+
+        self.code = code
+        self.status = "done" if code < 400 else "failed"
+        self.finished.set()
+
+
+    def json(self) -> dict[str, Any]:
+        """
+        Returns the ticket in JSON format
+
+        :return: {
+                    "id": <ticket id>,
+                    "job": <job name>,
+                    "status": <"queued", "running", "done" or "failed">,
+                    "location": <URL of build>,
+                    "code": <(optional) HTTP status code of finished upload>,
+                    "message": <(optional) HTTP status message of finished upload>
+                }
+        """
+
+        return {
+            "id": self.id,
+            "job": self.job,
+            "status": self.status,
+            "location": self.location,
+            "code": self.code,
+            "message": http.HTTPStatus(self.code).phrase if self.code is not None else None
+        }
+
+
+class IngestQueue:
+    """
+    Bounded queue of uploads processed by background worker threads, can be shared by all jobs. Uploads still queued
+    when stopping are not processed, they have to be persisted by the caller to be queued again after starting
+
+    Functions:  1) start        -> start worker threads
+                2) stop         -> stop worker threads after current uploads
+                3) submit       -> queue a new upload
+                4) get          -> returns ticket of an upload
+                5) wait         -> waits for an upload to finish
+                6) stats        -> returns statistics on queue
+    """
+
+    def __init__(self, workers: int = 2, size: int = 32, history: int = 1024):
+        """
+        Constructor of class IngestQueue
+
+        :param workers: number of worker threads
+        :param size: maximum number of queued uploads
+        :param history: number of finished tickets kept to be queried
+        """
+
+        self.workers = workers
+        self.size = size
+        self.history = history
+
+        self.queue = queue.Queue(maxsize=size)
+        self.tickets: OrderedDict[str, IngestTicket] = OrderedDict()
+        self.lock = threading.Lock()
+        self.threads: list[threading.Thread] = []
+        self.running = 0
+        self.stopped = False
+
+
+    def start(self):
+        """
+        Starts the worker threads (when not already running)
+        """
+
+        if len(self.threads) > 0:
+            return
+
+        with self.lock:
+            self.stopped = False
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"IngestQueue-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+
+    def stop(self):
+        """
+        Stops the worker threads after the uploads currently processed, uploads still queued are not processed (and no
+        new ones accepted) so stopping does not wait for them nor do they run while other parts are stopped already
+        """
+
+        with self.lock:
+            self.stopped = True
+
+        # remove what is queued, so the worker threads get the signal to stop right away
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+
+        for _ in self.threads:
+            self.queue.put((None, None))
+        for thread in self.threads:
+            thread.join()
+
+        self.threads = []
+
+
+    def submit(self, job: str, location: str, task: Callable[[], int], id: Optional[str] = None) -> IngestTicket:
+        """
+        Queues a new upload
+
+        :param job: job name
+        :param location: URL of the build once it was added
+        :param task: processes the upload, returns the HTTP status code
+        :param id: (optional) ticket id, a new one if not provided
+        :return: ticket of upload
+        :exception IngestDuplicateException: when the same build is already queued / processed
+        :exception IngestQueueFullException: when no more uploads can be queued (or stopping)
+        """
+
+        with self.lock:
+            if self.stopped:
+                raise IngestQueueFullException(f"Upload of build {location} cannot be queued, the server is stopping")
+
+            for ticket in self.tickets.values():
+                if ticket.location == location and not ticket.finished.is_set():
+                    raise IngestDuplicateException(f"Upload of build {location} is already queued as {ticket.id}")
+
+            ticket = IngestTicket(job, location, id)
+            try:
+                self.queue.put_nowait((ticket, task))
+            except queue.Full:
+                raise IngestQueueFullException(
+                    f"Upload of build {location} cannot be queued, already {self.size} uploads waiting"
+                ) from None
+
+            self.tickets[ticket.id] = ticket
+
+            # forget the oldest finished tickets
+            while len(self.tickets) > self.history:
+                oldest = next(iter(self.tickets.values()))
+                if not oldest.finished.is_set():
+                    break
+                self.tickets.popitem(last=False)
+
+        return ticket
+
+
+    def get(self, id: str) -> Optional[IngestTicket]:
+        """
+        Returns a ticket
+
+        :param id: ticket id
+        :return: ticket or None
+        """
+
+        with self.lock:
+            return self.tickets.get(id)
+
+
+    def wait(self, id: str, timeout: float) -> Optional[IngestTicket]:
+        """
+        Waits for an upload to finish
+
+        :param id: ticket id
+        :param timeout: maximum time to wait in seconds
+        :return: ticket (maybe not finished yet) or None
+        """
+
+        ticket = self.get(id)
+        if ticket is not None:
+            ticket.finished.wait(timeout)
+
+        return ticket
+
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns statistics on the queue
+
+        :return: {
+                    "workers": <number of worker threads>,
+                    "size": <maximum number of queued uploads>,
+                    "queued": <number of queued uploads>,
+                    "running": <number of uploads currently processed>
+                }
+        """
+
+        return {
+            "workers": self.workers,
+            "size": self.size,
+            "queued": self.queue.qsize(),
+            "running": self.running
+        }
+
+
+    def _work(self):
+        """
+        Worker thread processing queued uploads
+        """
+
+        while True:
+            ticket, task = self.queue.get()
+            if ticket is None:
+                return
+
+            with self.lock:
+                if self.stopped:
+                    continue
+                self.running += 1
+            ticket.status = "running"
+
+            try:
+                code = task()
+            except Exception:
+                cherrypy.log(
+                    f"Processing upload of build {ticket.location} ({ticket.id}) in the background failed with an " +
+                    "exception", "INGEST", traceback=True
+                )
+                code = 500
+            finally:
+                with self.lock:
+                    self.running -= 1
+
+            ticket.finish(code)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+app/util/Manifest.py
+
+Copyright (C) 2021-2023, VISUS Health IT GmbH
+This software and supporting documentation were developed by
+  VISUS Health IT GmbH
+  Gesundheitscampus-Sued 15
+  D-44801 Bochum, Germany
+  http://www.visus.com
+  mailto:info@visus.com
+
+-> see LICENCE at root of repository
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+from collections import OrderedDict
+from typing import Optional
+from .Objects import Objects
+
+
+# file name of manifest inside the build data, hidden as it is not part of the report
+MANIFEST = ".manifest.json"
+
+
+class Manifest:
+    """
+    List of all files of a build (path relative to the build data -> size, modification time, SHA-1), used to resolve
+    files without asking the file system
+
+    Functions:  1) resolve      -> returns relative path of a file when part of the build
+                2) exists       -> checks whether a file is part of the build
+                3) get          -> returns size, modification time and SHA-1 of a file
+    """
+
+    def __init__(self, root: str, files: dict[str, tuple[int, float, str]]):
+        """
+        Constructor of class Manifest
+
+        :param root: path of the build data
+        :param files: {<relative path>: (<size>, <modification time>, <SHA-1>), ...}
+        """
+
+        self.root = root
+        self.files = files
+
+
+    def resolve(self, *args: str) -> Optional[str]:
+        """
+        Returns the relative path of a file when it is part of the build
+
+        :param args: parts of the path from the URL
+        :return: relative path or None (not part of the build or outside of it)
+        """
+
+        path = os.path.normpath("/".join(args)).replace(os.sep, "/")
+        return path if path in self.files else None
+
+
+    def exists(self, path: str) -> bool:
+        """
+        Checks whether a file is part of the build
+
+        :param path: absolute path of the file
+        :return: True if part of the build, False otherwise
+        """
+
+        return os.path.relpath(path, self.root).replace(os.sep, "/") in self.files
+
+
+    def get(self, path: str) -> Optional[tuple[int, float, str]]:
+        """
+        Returns information on a file
+
+        :param path: relative path of the file
+        :return: (<size>, <modification time>, <SHA-1>) or None
+        """
+
+        return self.files.get(path)
+
+
+def writeManifest(path: str, objects: Optional[Objects] = None) -> Manifest:
+    """
+    Creates the manifest of a build by reading all of its files and saves it inside the build data
+
+    :param path: path of the build data
+    :param objects: (optional) store identical files are replaced with hardlinks from
+    :return: manifest
+    :exception OSError: when files could not be read or the manifest could not be written
+    """
+
+    files: dict[str, tuple[int, float, str]] = {}
+
+    for root, _, names in os.walk(path):
+        for name in names:
+            file = os.path.join(root, name)
+            relative_path = os.path.relpath(file, path).replace(os.sep, "/")
+            if relative_path == MANIFEST or relative_path.endswith(".tmp"):
+                continue
+
+            sha1 = hashlib.sha1()
+            with open(file, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    sha1.update(chunk)
+
+            if objects is not None:
+                objects.link(file, sha1.hexdigest())
+
+            stat = os.stat(file)
+            files[relative_path] = (stat.st_size, stat.st_mtime, sha1.hexdigest())
+
+    with open(os.path.join(path, MANIFEST + ".tmp"), "w") as f:
+        json.dump(files, f, separators=(",", ":"))
+    os.replace(os.path.join(path, MANIFEST + ".tmp"), os.path.join(path, MANIFEST))
+
+    return Manifest(path, files)
+
+
+def readManifest(path: str) -> Optional[Manifest]:
+    """
+    Loads the manifest of a build
+
+    :param path: path of the build data
+    :return: manifest or None when not existing (e.g. build added before manifests were written)
+    """
+
+    try:
+        with open(os.path.join(path, MANIFEST), "r") as f:
+            files = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    return Manifest(path, {file: tuple(info) for file, info in files.items()})
+
+
+class Manifests:
+    """
+    Manifests of builds loaded lazily and kept in memory (least recently used ones are forgotten)
+
+    Functions:  1) get          -> returns manifest of a build
+                2) write        -> creates manifest of a build
+                3) forget       -> removes manifests of builds from memory
+    """
+
+    def __init__(self, size: int = 256, objects: Optional[Objects] = None):
+        """
+        Constructor of class Manifests
+
+        :param size: maximum number of manifests kept in memory
+        :param objects: (optional) store identical files are replaced with hardlinks from when writing manifests
+        """
+
+        self.size = size
+        self.objects = objects
+        self.manifests: OrderedDict[str, Optional[Manifest]] = OrderedDict()
+        self.lock = threading.Lock()
+
+
+    def get(self, path: str) -> Optional[Manifest]:
+        """
+        Returns the manifest of a build, loads it when not in memory
+
+        :param path: path of the build data
+        :return: manifest or None when build has none
+        """
+
+        with self.lock:
+            if path in self.manifests:
+                self.manifests.move_to_end(path)
+                return self.manifests[path]
+
+        # builds without manifest are remembered too, they are resolved using the file system
+        manifest = readManifest(path)
+        self._put(path, manifest)
+
+        return manifest
+
+
+    def write(self, path: str) -> Optional[Manifest]:
+        """
+        Creates the manifest of a build (again, e.g. after files were added) and keeps it in memory
+
+        :param path: path of the build data
+        :return: manifest or None when it could not be written (e.g. build deleted meanwhile)
+        """
+
+        try:
+            manifest = writeManifest(path, self.objects)
+        except OSError:
+            self.forget(path)
+            return None
+
+        self._put(path, manifest)
+        return manifest
+
+
+    def forget(self, prefix: str):
+        """
+        Removes manifests from memory
+
+        :param prefix: path of the build data or a parent directory (e.g. of a branch)
+        """
+
+        with self.lock:
+            for path in list(self.manifests.keys()):
+                if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                    del self.manifests[path]
+
+
+    def _put(self, path: str, manifest: Optional[Manifest]):
+        """
+        Keeps a manifest in memory
+
+        :param path: path of the build data
+        :param manifest: manifest or None when build has none
+        """
+
+        with self.lock:
+            self.manifests[path] = manifest
+            self.manifests.move_to_end(path)
+
+            while len(self.manifests) > self.size:
+                self.manifests.popitem(last=False)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+app/util/Objects.py
+
+Copyright (C) 2021-2023, VISUS Health IT GmbH
+This software and supporting documentation were developed by
+  VISUS Health IT GmbH
+  Gesundheitscampus-Sued 15
+  D-44801 Bochum, Germany
+  http://www.visus.com
+  mailto:info@visus.com
+
+-> see LICENCE at root of repository
+"""
+
+import os
+import threading
+
+
+# directory of the object store inside the data of a job, hidden as it is no branch
+OBJECTS = ".objects"
+
+
+class Objects:
+    """
+    Content-addressed store of report files (keyed by SHA-1) of a single job. Identical files of different builds are
+    replaced by hardlinks to the same object, so they only use disk space once. An object is no longer referenced when
+    it has no other link than the one inside the store.
+
+    Functions:  1) link         -> replaces a file by a hardlink to the identical object
+                2) collect      -> removes objects no longer referenced by any build
+                3) stats        -> returns statistics on store
+    """
+
+    def __init__(self, path: str):
+        """
+        Constructor of class Objects
+
+        :param path: path of the object store (on the same file system as the build data)
+        """
+
+        self.path = path
+
+        self.lock = threading.Lock()
+        self.linked = 0
+        self.saved = 0
+        self.collected = 0
+
+
+    def link(self, file: str, sha1: str) -> bool:
+        """
+        Adds a file to the store, replaces it by a hardlink when an identical object is already stored. Files must not
+        be changed in place afterwards as this changes every build sharing them!
+
+        :param file: path of the file inside the build data
+        :param sha1: SHA-1 of the file content
+        :return: True if replaced by an existing object, False otherwise (new object or not linkable)
+        """
+
+        object_path = os.path.join(self.path, sha1[:2], sha1)
+
+        for _ in range(2):
+            try:
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                os.link(file, object_path)
+                return False
+            except FileExistsError:
+                pass
+            except OSError:
+                # e.g. too many links to an object or a file system without hardlinks, the file stays a copy
+                return False
+
+            try:
+                stat = os.stat(object_path)
+                if os.path.samestat(stat, os.stat(file)):
+                    return False
+                if stat.st_size != os.path.getsize(file):
+                    return False
+
+                # file only appears replaced as a whole, it might be served right now
+                os.link(object_path, file + ".tmp")
+                os.replace(file + ".tmp", file)
+            except FileNotFoundError:
+                # object collected meanwhile, store the file as new object instead
+                continue
+            except OSError:
+                try:
+                    os.remove(file + ".tmp")
+                except OSError:
+                    pass
+                return False
+
+            with self.lock:
+                self.linked += 1
+                self.saved += stat.st_size
+            return True
+
+        return False
+
+
+    def collect(self) -> tuple[int, int]:
+        """
+        Removes all objects no longer referenced by any build (only linked from inside the store)
+
+        :return: (<number of objects removed>, <bytes freed>)
+        """
+
+        files = 0
+        size = 0
+
+        try:
+            directories = list(os.scandir(self.path))
+        except OSError:
+            return 0, 0
+
+        for directory in directories:
+            if not directory.is_dir(follow_symlinks=False):
+                continue
+
+            try:
+                with os.scandir(directory.path) as entries:
+                    entries = list(entries)
+            except OSError:
+                continue
+
+            for entry in entries:
+                try:
+                    stat = entry.stat(follow_symlinks=False)
+                    if stat.st_nlink == 1:
+                        os.remove(entry.path)
+                        files += 1
+                        size += stat.st_size
+                except OSError:
+                    continue
+
+        with self.lock:
+            self.collected += files
+
+        return files, size
+
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns statistics on the store
+
+        :return: {
+                    "linked": <number of files replaced by existing objects>,
+                    "saved": <bytes not written twice>,
+                    "collected": <number of unreferenced objects removed>
+                }
+        """
+
+        with self.lock:
+            return {
+                "linked": self.linked,
+                "saved": self.saved,
+                "collected": self.collected
+            }
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+app/util/Retention.py
+
+Copyright (C) 2021-2023, VISUS Health IT GmbH
+This software and supporting documentation were developed by
+  VISUS Health IT GmbH
+  Gesundheitscampus-Sued 15
+  D-44801 Bochum, Germany
+  http://www.visus.com
+  mailto:info@visus.com
+
+-> see LICENCE at root of repository
+"""
+
+import fnmatch
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class RetentionPolicy:
+    """
+    Builds of a job kept when cleaning up regularly, the latest build of a branch is always kept. Builds are deleted
+    when exceeding the number of builds to keep or the number of days to keep them (whichever deletes more).
+    """
+
+    keep: Optional[int] = 12                                                # latest builds kept per branch
+    max_days: Optional[float] = None                                        # days builds are kept
+    branches: dict[str, "RetentionPolicy"] = field(default_factory=dict)    # overrides, branch name or pattern
+
+
+    def get(self, branch: str) -> "RetentionPolicy":
+        """
+        Returns the policy of a branch, the first override matching the branch name (e.g. "release/*") or this one
+
+        :param branch: branch name
+        :return: policy
+        """
+
+        for pattern, policy in self.branches.items():
+            if fnmatch.fnmatchcase(branch, pattern):
+                return policy
+
+        return self
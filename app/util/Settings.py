@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+app/util/Settings.py
+
+Copyright (C) 2021-2023, VISUS Health IT GmbH
+This software and supporting documentation were developed by
+  VISUS Health IT GmbH
+  Gesundheitscampus-Sued 15
+  D-44801 Bochum, Germany
+  http://www.visus.com
+  mailto:info@visus.com
+
+-> see LICENCE at root of repository
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+from .Compress import Precompressor
+from .Ingest import IngestQueue
+from .Retention import RetentionPolicy
+from .Trash import Reaper
+from .Upload import ParserPool
+
+
+@dataclass
+class Settings:
+    """
+    Tunable settings of a single or multi project job
+    """
+
+    parser: Optional[ParserPool] = None                                     # (shared) processes parsing jUnit XML
+    ingest: Optional[IngestQueue] = None                                    # (shared) queue processing uploads
+    precompress: Optional[Precompressor] = None                             # (shared) compressor of report files
+    reaper: Optional[Reaper] = None                                         # (shared) remover of deleted files
+    pool_size: int = 16                                                     # (shared) pooled connections, 0 disables
+    cache_size: int = 1024                                                  # cached JSON responses, 0 disables
+    cache_ttl: float = 60.0                                                 # seconds a cached JSON response is used
+    max_age: int = 5                                                        # seconds clients reuse changing responses
+    offload: Optional[str] = None                                           # "X-Accel-Redirect" or "X-Sendfile"
+    offload_prefix: str = "/reports"                                        # internal nginx location of "data"
+    storage: str = "files"                                                  # "files" (extracted) or "archive" (ZIP)
+    dedup: bool = False                                                     # hardlink identical files of builds
+    retention: Optional[RetentionPolicy] = None                             # builds kept when cleaning up regularly
+    quota: Optional[int] = None                                             # bytes of build data kept of the job
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+app/util/Trash.py
+
+Copyright (C) 2021-2023, VISUS Health IT GmbH
+This software and supporting documentation were developed by
+  VISUS Health IT GmbH
+  Gesundheitscampus-Sued 15
+  D-44801 Bochum, Germany
+  http://www.visus.com
+  mailto:info@visus.com
+
+-> see LICENCE at root of repository
+"""
+
+import cherrypy
+import os
+import queue
+import threading
+import time
+import uuid
+
+from typing import Any, Callable, Optional
+
+
+# directory of deleted data inside the data of a job, hidden as it is no branch
+TRASH = ".trash"
+
+
+def moveToTrash(path: str, trash: str) -> Optional[str]:
+    """
+    Moves a file / directory into the trash by renaming it, so it disappears at once regardless of its size
+
+    :param path: file / directory to delete
+    :param trash: path of the trash (on the same file system)
+    :return: path inside the trash or None when not existing
+    """
+
+    target = os.path.join(trash, uuid.uuid4().hex)
+
+    try:
+        os.makedirs(trash, exist_ok=True)
+        os.rename(path, target)
+    except FileNotFoundError:
+        return None
+
+    return target
+
+
+class Reaper:
+    """
+    Removes the content of trash directories in the background, throttled to a number of files per second so deleting
+    lots of builds does not starve the disk serving reports. Can be shared by all jobs, what is left in the trash when
+    stopping is scanned again when starting.
+
+    Functions:  1) submit       -> remove a file / directory in the trash
+                2) scan         -> remove everything already in a trash directory
+                3) stop         -> stop after the current file / directory
+                4) stats        -> returns statistics on reaper
+    """
+
+    def __init__(self, rate: int = 1000):
+        """
+        Constructor of class Reaper
+
+        :param rate: maximum number of files removed per second, zero does not throttle
+        """
+
+        self.rate = rate
+
+        self.queue: queue.Queue[Optional[tuple[str, Optional[Callable[[str], Any]]]]] = queue.Queue()
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+        self.queued = 0
+        self.files = 0
+
+
+    def submit(self, path: str, done: Optional[Callable[[str], Any]] = None):
+        """
+        Removes a file / directory in the trash in the background
+
+        :param path: path inside the trash
+        :param done: (optional) called with the path after it was removed
+        """
+
+        with self.lock:
+            if self.stopped.is_set():
+                return
+
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="Reaper", daemon=True)
+                self.thread.start()
+
+            self.queued += 1
+
+        self.queue.put((path, done))
+
+
+    def scan(self, trash: str, done: Optional[Callable[[str], Any]] = None):
+        """
+        Removes everything already in a trash directory (e.g. left when the server stopped) in the background
+
+        :param trash: path of the trash
+        :param done: (optional) called with the path of the last file / directory after everything was removed
+        """
+
+        try:
+            with os.scandir(trash) as entries:
+                paths = [entry.path for entry in entries]
+        except OSError:
+            return
+
+        for i, path in enumerate(paths):
+            self.submit(path, done if i == len(paths) - 1 else None)
+
+
+    def stop(self):
+        """
+        Stops after the file / directory currently removed, the others stay in the trash
+        """
+
+        with self.lock:
+            self.stopped.set()
+            thread = self.thread
+
+        if thread is not None:
+            self.queue.put(None)
+            thread.join()
+
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns statistics on the reaper
+
+        :return: {
+                    "rate": <maximum number of files removed per second>,
+                    "queued": <number of files / directories in the trash not removed yet>,
+                    "files": <number of files removed>
+                }
+        """
+
+        with self.lock:
+            return {
+                "rate": self.rate,
+                "queued": self.queued,
+                "files": self.files
+            }
+
+
+    def _run(self):
+        """
+        Removes the files / directories submitted one after another until stopped
+        """
+
+        while not self.stopped.is_set():
+            item = self.queue.get()
+            if item is None:
+                return
+
+            path, done = item
+            try:
+                if self._remove(path) and done is not None:
+                    done(path)
+            except Exception:
+                # the reaper thread is shared by all jobs and must not die
+                cherrypy.log(f"Removing {path} from the trash failed with an exception", "REAPER", traceback=True)
+            finally:
+                with self.lock:
+                    self.queued -= 1
+
+
+    def _remove(self, path: str) -> bool:
+        """
+        Removes a file / directory bottom-up, sleeps whenever the number of files per second is exceeded
+
+        :param path: path inside the trash
+        :return: True when removed completely, False when stopped or not possible
+        """
+
+        start = time.monotonic()
+        files = 0
+
+        try:
+            if not os.path.isdir(path) or os.path.islink(path):
+                os.remove(path)
+                files = 1
+            else:
+                for root, directories, names in os.walk(path, topdown=False):
+                    for name in names:
+                        if self.stopped.is_set():
+                            return False
+
+                        os.remove(os.path.join(root, name))
+                        files += 1
+
+                        if self.rate > 0:
+                            delay = files / self.rate - (time.monotonic() - start)
+                            if delay > 0:
+                                time.sleep(delay)
+
+                    for directory in directories:
+                        if os.path.islink(os.path.join(root, directory)):
+                            os.remove(os.path.join(root, directory))
+                        else:
+                            os.rmdir(os.path.join(root, directory))
+                os.rmdir(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return False
+        finally:
+            with self.lock:
+                self.files += files
+
+        return True
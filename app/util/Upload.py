@@ -17,14 +17,37 @@ This software and supporting documentation were developed by
 
 import io
 import json
+import multiprocessing
 import os
 import re
 import shutil
+import tempfile
+import threading
+import uuid
 import xml.etree.ElementTree as ET
 import zipfile
+import zlib
 
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from cherrypy._cpreqbody import Part
-from typing import Any, Optional
+from typing import Any, BinaryIO, Callable, Optional, Union
+
+
+class InvalidUploadException(Exception):
+    """
+    Exception thrown when an upload is no valid ZIP archive or contains malformed jUnit XML files
+    """
+
+    def __init__(self, message: str):
+        """
+        Constructor of class InvalidUploadException
+
+        :param message: error message
+        """
+
+        super(InvalidUploadException, self).__init__(message)
+        self.message = message
 
 
 def loadJSON(metadata: Part) -> Optional[dict[str, Any]]:
@@ -106,49 +129,284 @@ def parseJUnitMetadata(metadata: dict[str, Any]) -> Optional[dict[str, Any]]:
         return None
 
 
-def unzipData(zip: Part, path: str) -> bool:
+def _openUpload(upload: Union[Part, str]) -> tuple[BinaryIO, bool]:
     """
-    Tries to unzip a ZIP archive (in CherryPy object) to a given path
+    Resolves a seekable file object for an uploaded file (in CherryPy object) without buffering it in memory
 
-    :param zip: ZIP archive (in CherryPy object)
-    :param path: to unzip content to
+    :param upload: uploaded file (in CherryPy object) or path to an upload saved with "saveUpload"
+    :return: file object positioned at its start AND True if it was newly created (must be closed by caller)
+    """
+
+    if isinstance(upload, str):
+        return open(upload, "rb"), True
+
+    if upload.file is None:
+        # CherryPy only keeps small parts without a filename in memory
+        return io.BytesIO(upload.value), True
+
+    try:
+        upload.file.seek(0)
+        return upload.file, False
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        data = tempfile.TemporaryFile()
+        shutil.copyfileobj(upload.file, data, 524288)
+        data.seek(0)
+        return data, True
+
+
+def saveUpload(upload: Union[Part, str], path: str) -> bool:
+    """
+    Tries to save an uploaded file (in CherryPy object) to a given path, streamed without buffering it in memory
+
+    :param upload: uploaded file (in CherryPy object) or path to an upload saved before
+    :param path: to save the file to
     :return: True if everything worked correctly, False otherwise
     """
 
     data = None
+    close = False
+    created = False
     try:
-        data = io.BytesIO()
-        while True:
-            bits = zip.file.read(524288)
-            if not bits:
-                break
-            data.write(bits)
-        data.seek(0)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
 
-        with zipfile.ZipFile(data, "r") as out:
-            out.extractall(path)
+        data, close = _openUpload(upload)
+        with open(path, "xb") as file:
+            created = True
+            shutil.copyfileobj(data, file, 524288)
     except Exception:
-        shutil.rmtree(path, ignore_errors=True)
+        if created:
+            os.remove(path)
         return False
     finally:
-        if data is not None:
+        if data is not None and close:
             data.close()
-            del data
 
     return True
 
 
-def parseJUnitXMLResults(path: str) -> Optional[dict[str, int]]:
+def storeArchive(zip: Union[Part, str], path: str, files: Optional[dict[str, str]] = None) -> bool:
     """
-    Parses jUnit XML results and resolves number of successful / skipped / flaky / failed tests
+    Tries to store a ZIP archive (in CherryPy object) as it is, only if not already existing. The archive is checked
+    and additional files can be added to it before it appears at the given path
 
-    :param path: where XML files can be found
+    :param zip: ZIP archive (in CherryPy object) or path to an upload saved with "saveUpload"
+    :param path: to store the archive to
+    :param files: (optional) files added to the archive {<name in archive>: <content>, ...}
+    :return: True if everything worked correctly, False otherwise (e.g. already existing)
+    """
+
+    temp = f"{path}.{uuid.uuid4().hex}.tmp"
+    if not saveUpload(zip, temp):
+        return False
+
+    try:
+        with zipfile.ZipFile(temp, "a" if files else "r", zipfile.ZIP_DEFLATED) as archive:
+            for name, content in (files or {}).items():
+                archive.writestr(name, content)
+
+        # fails when already existing, contrary to a rename
+        os.link(temp, path)
+    except Exception:
+        return False
+    finally:
+        os.remove(temp)
+
+    return True
+
+
+def selectJUnitFiles(member: zipfile.ZipInfo) -> bool:
+    """
+    Selects the members of a ZIP archive needed to parse the test results: jUnit XML files (no matter the case of their
+    extension, like "JUnitXMLCollector.add") and the index.html of all subprojects (for their duration)
+
+    :param member: member of ZIP archive
+    :return: True when needed, False otherwise
+    """
+
+    return member.filename.lower().endswith(".xml") or \
+        re.fullmatch(r"projects/[^/]+/index\.html", member.filename) is not None
+
+
+def unzipData(zip: Union[Part, str], path: str, callback: Optional[Callable[[str], None]] = None,
+              select: Optional[Callable[[zipfile.ZipInfo], bool]] = None) -> int:
+    """
+    Tries to unzip a ZIP archive (in CherryPy object) to a given path
+
+    The archive is opened directly from the file CherryPy spooled the upload to and extracted member by member, so
+    the memory used does not depend on the size of the archive.
+
+    :param zip: ZIP archive (in CherryPy object) or path to an upload saved with "saveUpload"
+    :param path: to unzip content to
+    :param callback: (optional) called with the path of every file as soon as it was extracted
+    :param select: (optional) only members for which this returns True are extracted
+    :return: number of bytes extracted
+    :exception InvalidUploadException: when no valid ZIP archive
+    :exception OSError: when extracting failed, e.g. disk full (as any other exception, the path is removed)
+    """
+
+    data = None
+    close = False
+    size = 0
+    try:
+        data, close = _openUpload(zip)
+
+        with zipfile.ZipFile(data, "r") as out:
+            for member in out.infolist():
+                if select is not None and not select(member):
+                    continue
+
+                file = out.extract(member, path)
+                size += member.file_size
+                if callback is not None and not member.is_dir():
+                    callback(file)
+    except (zipfile.BadZipFile, zlib.error, EOFError, NotImplementedError) as err:
+        shutil.rmtree(path, ignore_errors=True)
+        raise InvalidUploadException(f"Upload is no valid ZIP archive: {err}") from err
+    except BaseException:
+        shutil.rmtree(path, ignore_errors=True)
+        raise
+    finally:
+        if data is not None and close:
+            data.close()
+
+    return size
+
+
+def _parseJUnitXMLFile(file: str) -> Optional[tuple[int, int, int, int]]:
+    """
+    Parses a single jUnit XML file, must be picklable to be used in worker processes
+
+    The file is streamed and every element is cleared as soon as it was read, so neither the whole tree nor big
+    "system-out" / "system-err" captures stay in memory.
+
+    :param file: path to jUnit XML file
+    :return: (<number of tests>, <number of skipped tests>, <number of flaky tests>, <number of failures>) or None
+    """
+
+    root = None
+    attributes = {}
+    parents = []
+    flaky = 0
+
+    for event, element in ET.iterparse(file, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                # only the attributes of the root element are needed
+                root = element
+                attributes = dict(element.attrib)
+            elif element.tag == "flakyFailure" and len(parents) > 1 and parents[-1] == "testcase":
+                # equivalent to ".//testcase/flakyFailure" on the root element
+                flaky += 1
+
+            parents.append(element.tag)
+        else:
+            parents.pop()
+            element.clear()
+
+            # drop the already cleared children from the root element as well
+            if len(parents) == 1:
+                root.clear()
+
+    try:
+        return (
+            int(attributes["tests"]),
+            int(attributes["skipped"]),
+            flaky,
+            int(attributes["failures"])
+        )
+    except (KeyError, ValueError):
+        return None
+
+
+class ParserPool:
+    """
+    Long-lived pool of worker processes parsing jUnit XML files, can be shared by all jobs. The processes are started
+    once instead of for every upload, by a fork server where available so they do not inherit locks held by other
+    threads of the server
+
+    Functions:  1) submit       -> parse a file in a worker process
+                2) stop         -> stop the worker processes
+    """
+
+    def __init__(self, workers: int = os.cpu_count() or 1):
+        """
+        Constructor of class ParserPool
+
+        :param workers: number of worker processes, started when first used
+        """
+
+        self.workers = workers
+
+        self.lock = threading.Lock()
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.stopped = False
+
+
+    def submit(self, file: str) -> Future:
+        """
+        Parses a single jUnit XML file in a worker process
+
+        :param file: path to jUnit XML file
+        :return: future of the result of "_parseJUnitXMLFile"
+        :exception RuntimeError: when already stopped
+        """
+
+        executor = self._executor()
+        try:
+            return executor.submit(_parseJUnitXMLFile, file)
+        except BrokenProcessPool:
+            # a worker process died (e.g. killed), start new ones once
+            return self._executor(executor).submit(_parseJUnitXMLFile, file)
+
+
+    def stop(self):
+        """
+        Stops the worker processes after the files currently parsed, the others are not parsed
+        """
+
+        with self.lock:
+            self.stopped = True
+            executor = self.executor
+            self.executor = None
+
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+    def _executor(self, broken: Optional[ProcessPoolExecutor] = None) -> ProcessPoolExecutor:
+        """
+        Returns the executor of the worker processes, creates it when first used
+
+        :param broken: (optional) executor no longer usable, replaced when still the current one
+        :return: executor
+        :exception RuntimeError: when already stopped
+        """
+
+        with self.lock:
+            if self.stopped:
+                raise RuntimeError("Parser pool already stopped")
+
+            if self.executor is None or self.executor is broken:
+                methods = multiprocessing.get_all_start_methods()
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                )
+
+            return self.executor
+
+
+def _sumJUnitXMLResults(results: list[Optional[tuple[int, int, int, int]]]) -> Optional[dict[str, int]]:
+    """
+    Sums up results of multiple jUnit XML files
+
+    :param results: results of "_parseJUnitXMLFile"
     :return: {
                 "successful": <number of tests>,
                 "skipped": <number of tests>,
                 "flaky": <number of tests>,
                 "failed": <number of tests>
-            } or None
+            } or None if any of the files could not be parsed
     """
 
     all_tests = 0
@@ -159,32 +417,143 @@ def parseJUnitXMLResults(path: str) -> Optional[dict[str, int]]:
         "failed": 0
     }
 
-    try:
-        for root, _, files in os.walk(path):
-            for file in files:
-                if file.lower().endswith(".xml"):
-                    data = ET.parse(os.path.join(root, file)).getroot()
+    for result in results:
+        if result is None:
+            return None
 
-                    # get number of all tests
-                    all_tests += int(data.attrib["tests"])
+        tests, skipped, flaky, failures = result
 
-                    # all skipped tests
-                    ret["skipped"] += int(data.attrib["skipped"])
+        # get number of all tests
+        all_tests += tests
 
-                    # all flaky tests
-                    flaky = len(data.findall(".//testcase/flakyFailure"))
-                    ret["flaky"] += flaky
+        # all skipped tests
+        ret["skipped"] += skipped
 
-                    # all failed tests
-                    ret["failed"] += int(data.attrib["failures"]) - flaky
-    except (KeyError, ValueError):
-        return None
+        # all flaky tests
+        ret["flaky"] += flaky
+
+        # all failed tests
+        ret["failed"] += failures - flaky
 
     # all successful tests
     ret["successful"] = all_tests - (ret["flaky"] + ret["failed"])
     return ret
 
 
+def _sumJUnitXMLResultsBySubproject(path: str, subprojects: list[str], files: list[str],
+                                    results: list[Optional[tuple[int, int, int, int]]]) -> tuple[
+            Optional[dict[str, int]], dict[str, Optional[dict[str, int]]]
+        ]:
+    """
+    Sums up results of multiple jUnit XML files for the whole build and for every subproject
+
+    :param path: where XML files can be found
+    :param subprojects: names of all subprojects
+    :param files: paths to XML files
+    :param results: results of "_parseJUnitXMLFile" in the same order as the files
+    :return: (<results of all files, see "_sumJUnitXMLResults">, {
+                <subproject>: <results of the files in "projects/<subproject>", see "_sumJUnitXMLResults">,
+                ...
+            })
+    """
+
+    prefixes = {
+        subproject: os.path.join(os.path.normpath(path), "projects", subproject, "") for subproject in subprojects
+    }
+    buckets = {
+        subproject: [] for subproject in subprojects
+    }
+
+    for file, result in zip(files, results):
+        file = os.path.normpath(file)
+        for subproject, prefix in prefixes.items():
+            if file.startswith(prefix):
+                buckets[subproject].append(result)
+
+    return _sumJUnitXMLResults(results), {
+        subproject: _sumJUnitXMLResults(bucket) for subproject, bucket in buckets.items()
+    }
+
+
+class JUnitXMLCollector:
+    """
+    Parses jUnit XML results while they are still being extracted: every file added is handed to a worker process of
+    the (shared) pool right away, so the results are available as soon as the last file was added
+
+    Usage:  with JUnitXMLCollector(path, subprojects, parser) as collector:
+                unzipData(zip, path, collector.add)
+                tests, subproject_tests = collector.results()
+    """
+
+    def __init__(self, path: str, subprojects: Optional[list[str]] = None, parser: Optional[ParserPool] = None):
+        """
+        Constructor of class JUnitXMLCollector
+
+        :param path: where XML files are extracted to
+        :param subprojects: (optional) names of all subprojects
+        :param parser: (optional) pool of worker processes parsing the XML files, parses in the calling thread if not
+                       provided
+        """
+
+        self.path = path
+        self.subprojects = subprojects if subprojects is not None else []
+        self.parser = parser if parser is not None and parser.workers > 1 else None
+        self.files = []
+        self.futures = []
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+    def add(self, file: str):
+        """
+        Adds a file, only jUnit XML files are parsed
+
+        :param file: path to (just extracted) file
+        """
+
+        if not file.lower().endswith(".xml"):
+            return
+
+        self.files.append(file)
+        if self.parser is not None:
+            self.futures.append(self.parser.submit(file))
+
+
+    def results(self) -> tuple[Optional[dict[str, int]], dict[str, Optional[dict[str, int]]]]:
+        """
+        Waits for all files added to be parsed
+
+        :return: see "_sumJUnitXMLResultsBySubproject", subproject results are empty when no subprojects were given
+        :exception InvalidUploadException: when a jUnit XML file is malformed
+        """
+
+        try:
+            if self.parser is None:
+                results = [_parseJUnitXMLFile(file) for file in self.files]
+            else:
+                results = [future.result() for future in self.futures]
+        except ET.ParseError as err:
+            raise InvalidUploadException(f"Upload contains a malformed jUnit XML file: {err}") from err
+
+        return _sumJUnitXMLResultsBySubproject(self.path, self.subprojects, self.files, results)
+
+
+    def close(self):
+        """
+        Discards the files not parsed yet, the worker processes of the pool keep running
+        """
+
+        for future in self.futures:
+            future.cancel()
+        self.futures = []
+
+
 def parseJUnitHTMLDuration(path: str) -> Optional[float]:
     """
     Parses jUnit HTML report and resolves duration
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+app/util/Usage.py
+
+Copyright (C) 2021-2023, VISUS Health IT GmbH
+This software and supporting documentation were developed by
+  VISUS Health IT GmbH
+  Gesundheitscampus-Sued 15
+  D-44801 Bochum, Germany
+  http://www.visus.com
+  mailto:info@visus.com
+
+-> see LICENCE at root of repository
+"""
+
+import json
+import os
+import threading
+import time
+
+from typing import Optional
+from .Logging import Logging
+from .Utilities import decodeBranchName, encodeBranchName
+
+
+# file name of usage index inside the data of a job, hidden as it is no branch
+USAGE = ".usage.json"
+
+
+def _allocated(stat: os.stat_result) -> int:
+    """
+    Returns the bytes allocated on disk for a file / directory
+
+    :param stat: result of "os.lstat"
+    :return: allocated blocks, the size where not known (e.g. on Windows)
+    """
+
+    blocks = getattr(stat, "st_blocks", None)
+    return blocks * 512 if blocks is not None else stat.st_size
+
+
+def diskUsage(path: str, store: bool = False) -> int:
+    """
+    Returns the bytes the data of a build really uses on disk: all files (including precompressed variants, manifest
+    and failed_junit_tests.txt) and directories, every inode counted once. Files shared with other builds by hardlinks
+    only count with their share.
+
+    :param path: path of the build data (directory or ZIP archive)
+    :param store: files with hardlinks are also linked from an object store (see "Objects"), not counted as a build
+    :return: bytes
+    """
+
+    stat = os.lstat(path)
+    if not os.path.isdir(path):
+        return _allocated(stat)
+
+    seen: set[tuple[int, int]] = set()
+    ret = _allocated(stat)
+
+    for root, directories, names in os.walk(path):
+        for name in directories + names:
+            try:
+                stat = os.lstat(os.path.join(root, name))
+            except OSError:
+                continue
+
+            if (stat.st_dev, stat.st_ino) in seen:
+                continue
+            seen.add((stat.st_dev, stat.st_ino))
+
+            links = stat.st_nlink - 1 if store and stat.st_nlink > 1 else stat.st_nlink
+            ret += _allocated(stat) // max(links, 1)
+
+    return ret
+
+
+class Usage:
+    """
+    Index of the disk space used by the builds of a job, updated when builds are added or deleted, so quotas can be
+    enforced without walking the data. It is brought in line with the data by a scan when missing or when it might be
+    outdated (e.g. writing it failed), only builds not part of it are walked then.
+
+    Functions:  1) add          -> adds a new build
+                2) update       -> updates the size of a build (e.g. after compressing its files)
+                3) remove       -> removes builds or a whole branch
+                4) scan         -> brings the index in line with the data of the job
+                5) total        -> returns the bytes used by all builds
+                6) builds       -> returns all builds with size and time added
+    """
+
+    def __init__(self, path: str, log: Logging, store: bool = False):
+        """
+        Constructor of class Usage
+
+        :param path: path of the data of the job, the index file inside is loaded when existing
+        :param log: object of "Logging"
+        :param store: files are deduplicated using an object store, see "diskUsage"
+        """
+
+        self.path = path
+        self.log = log
+        self.store = store
+        self.lock = threading.Lock()
+
+        # {<branch name>: {<build id>: (<bytes>, <seconds since the epoch added>), ...}, ...}
+        self.branches: dict[str, dict[int, tuple[int, float]]] = {}
+
+        # the index file is missing / was not written, so it does not match the data
+        self.stale = False
+
+        try:
+            with open(f"{path}/{USAGE}", "r") as f:
+                self.branches = {
+                    branch: {int(id): (info[0], info[1]) for id, info in builds.items()}
+                    for branch, builds in json.load(f).items()
+                }
+        except (OSError, ValueError, LookupError, TypeError):
+            self.stale = True
+
+
+    def add(self, branch: str, id: int, size: int):
+        """
+        Adds a new build
+
+        :param branch: branch name
+        :param id: build id
+        :param size: bytes used by the build, see "diskUsage"
+        """
+
+        with self.lock:
+            self.branches.setdefault(branch, {})[id] = (size, time.time())
+            self._save()
+
+
+    def update(self, branch: str, id: int, size: int):
+        """
+        Updates the size of a build, only when still part of the index (it might have been deleted meanwhile)
+
+        :param branch: branch name
+        :param id: build id
+        :param size: bytes used by the build, see "diskUsage"
+        """
+
+        with self.lock:
+            if id not in self.branches.get(branch, {}):
+                return
+
+            self.branches[branch][id] = (size, self.branches[branch][id][1])
+            self._save()
+
+
+    def remove(self, branch: str, ids: Optional[list[int]] = None):
+        """
+        Removes builds of a branch or the whole branch
+
+        :param branch: branch name
+        :param ids: (optional) build ids, all builds of the branch when not provided
+        """
+
+        with self.lock:
+            if branch not in self.branches:
+                return
+
+            if ids is None:
+                del self.branches[branch]
+            else:
+                for id in ids:
+                    self.branches[branch].pop(id, None)
+                if len(self.branches[branch]) == 0:
+                    del self.branches[branch]
+
+            self._save()
+
+
+    def scan(self):
+        """
+        Brings the index in line with the data of the job: builds whose data no longer exists are removed, builds not
+        part of it (e.g. added before the index existed or while writing it failed) are added with their modification
+        time as time added. Only the folders of the branches are listed, builds are only walked when not part of it.
+        """
+
+        # {<branch name>: {<build id>: <path of the build data>, ...}, ...}
+        found: dict[str, dict[int, str]] = {}
+
+        try:
+            with os.scandir(self.path) as branches:
+                for branch in branches:
+                    # hidden folders (e.g. trash, deduplicated objects, uploads in progress) are no branches
+                    if branch.name.startswith(".") or not branch.is_dir(follow_symlinks=False):
+                        continue
+
+                    with os.scandir(branch.path) as entries:
+                        for entry in entries:
+                            id = entry.name[:-len(".zip")] if entry.name.endswith(".zip") else entry.name
+                            if id.isdigit():
+                                found.setdefault(decodeBranchName(branch.name), {})[int(id)] = entry.path
+        except FileNotFoundError:
+            pass
+        except OSError as err:
+            self.log.error(
+                __file__, "USAGE", f"Scanning '{self.path}' to update the usage index failed with an exception", err
+            )
+            return
+
+        with self.lock:
+            known = {(branch, id) for branch, builds in self.branches.items() for id in builds}
+
+        # walking builds takes long, so it is done without holding the lock
+        sizes: dict[tuple[str, int], tuple[int, float]] = {}
+        for branch, builds in found.items():
+            for id, path in builds.items():
+                if (branch, id) in known:
+                    continue
+
+                try:
+                    sizes[(branch, id)] = (diskUsage(path, self.store), os.lstat(path).st_mtime)
+                except OSError:
+                    continue
+
+        with self.lock:
+            changed = False
+
+            for branch in list(self.branches.keys()):
+                for id in list(self.branches[branch].keys()):
+                    if id in found.get(branch, {}) or self._exists(branch, id):
+                        continue
+
+                    del self.branches[branch][id]
+                    changed = True
+
+                if len(self.branches[branch]) == 0:
+                    del self.branches[branch]
+
+            for (branch, id), size in sizes.items():
+                # added (with its size) or deleted meanwhile
+                if id in self.branches.get(branch, {}) or not os.path.exists(found[branch][id]):
+                    continue
+
+                self.branches.setdefault(branch, {})[id] = size
+                changed = True
+
+            if changed or self.stale:
+                self._save()
+
+
+    def total(self) -> int:
+        """
+        Returns the bytes used by all builds
+
+        :return: bytes
+        """
+
+        with self.lock:
+            return sum(size for builds in self.branches.values() for size, _ in builds.values())
+
+
+    def builds(self) -> list[tuple[str, int, int, float]]:
+        """
+        Returns all builds
+
+        :return: [
+                    (<branch name>, <build id>, <bytes>, <seconds since the epoch added>),
+                    ...
+                 ]
+        """
+
+        with self.lock:
+            return [
+                (branch, id, size, added)
+                for branch, builds in self.branches.items() for id, (size, added) in builds.items()
+            ]
+
+
+    def _exists(self, branch: str, id: int) -> bool:
+        """
+        Checks whether the data of a build exists (extracted or as ZIP archive)
+
+        :param branch: branch name
+        :param id: build id
+        :return: True if existing, False otherwise
+        """
+
+        path = f"{self.path}/{encodeBranchName(branch)}/{id}"
+        return os.path.exists(path) or os.path.exists(f"{path}.zip")
+
+
+    def _save(self):
+        """
+        Writes the index file (lock must be held), it only appears complete. When this fails the index is marked as
+        stale, so the next scan writes it again
+        """
+
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            with open(f"{self.path}/{USAGE}.tmp", "w") as f:
+                json.dump(
+                    {
+                        branch: {str(id): [size, added] for id, (size, added) in builds.items()}
+                        for branch, builds in self.branches.items()
+                    }, f, separators=(",", ":")
+                )
+            os.replace(f"{self.path}/{USAGE}.tmp", f"{self.path}/{USAGE}")
+        except OSError as err:
+            self.stale = True
+            self.log.error(
+                __file__, "USAGE", f"Writing usage index '{self.path}/{USAGE}' failed with an exception, it is " +
+                "written again with the next change / scan", err
+            )
+            return
+
+        self.stale = False
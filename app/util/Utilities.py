@@ -15,9 +15,21 @@ This software and supporting documentation were developed by
 -> see LICENCE at root of repository
 """
 
+import cherrypy
+import hashlib
+import mimetypes
 import os.path
+import posixpath
+import shutil
+import time
+import urllib.parse
+import zipfile
 
-from cherrypy.lib.static import serve_file
+from typing import Callable, Optional
+from cherrypy.lib import cptools, httputil
+from cherrypy.lib.static import _serve_fileobj, serve_file
+from .Compress import ENCODINGS
+from .Manifest import Manifest
 
 
 def encodeBranchName(branch: str) -> str:
@@ -42,17 +54,276 @@ def decodeBranchName(branch: str) -> str:
     return branch.replace("--", "/")
 
 
-def resolveFile(result_path: str, *args: str):
+def resolveFile(result_path: str, *args: str, manifest: Optional[Manifest] = None, offload: Optional[str] = None,
+                offload_root: Optional[str] = None, offload_prefix: str = ""):
     """
-    Tries to resolve a file (part of jUnit report)
+    Tries to resolve a file (part of jUnit report), a precompressed variant is served when accepted by the client.
+    Only files inside the result path are served! With the manifest of the build the file system is only used to read
+    the file itself. Optionally the file is not sent by CherryPy, instead a header tells the proxy in front (e.g. nginx
+    or Apache) to send it:
+
+    - X-Accel-Redirect (nginx): internal URI made of prefix and path relative to root, nginx must compress itself
+    - X-Sendfile (Apache / lighttpd): absolute path of the file or its precompressed variant
 
     :param result_path: path to jUnit report of specific build of specific branch
     :param args: additional arguments from URL
+    :param manifest: (optional) manifest of the build, the file system is asked if not provided
+    :param offload: (optional) "X-Accel-Redirect" or "X-Sendfile", CherryPy sends the file itself if not provided
+    :param offload_root: (optional) directory the internal URIs of "X-Accel-Redirect" are relative to
+    :param offload_prefix: (optional) prefix of the internal URIs of "X-Accel-Redirect" (e.g. "/reports")
+    :return: file if found or None AND final path (for debugging)
+    """
+
+    if manifest is not None:
+        relative_path = manifest.resolve(*args)
+        final_path = os.path.join(result_path, relative_path if relative_path is not None else "/".join(args))
+        if relative_path is None:
+            return None, final_path
+    else:
+        root = os.path.realpath(result_path)
+        final_path = os.path.realpath(os.path.join(root, "/".join(args)))
+        if os.path.commonpath([root, final_path]) != root or not os.path.isfile(final_path):
+            return None, final_path
+
+    # content type of the original file, not the one of the compressed variant
+    content_type, _ = mimetypes.guess_type(final_path)
+
+    if offload == "X-Accel-Redirect" and offload_root is not None:
+        relative_path = os.path.relpath(
+            final_path, offload_root if manifest is not None else os.path.realpath(offload_root)
+        )
+        if not relative_path.startswith(".."):
+            cherrypy.response.headers["Content-Type"] = content_type or "application/octet-stream"
+            cherrypy.response.headers["X-Accel-Redirect"] = \
+                offload_prefix.rstrip("/") + "/" + urllib.parse.quote(relative_path.replace(os.sep, "/"))
+            return "", final_path
+
+    varyEncoding(final_path, manifest.exists if manifest is not None else os.path.isfile)
+    encoding = negotiateEncoding(final_path, manifest.exists if manifest is not None else os.path.isfile)
+    if encoding is not None:
+        cherrypy.response.headers["Content-Encoding"] = encoding
+
+    if offload == "X-Sendfile":
+        cherrypy.response.headers["Content-Type"] = content_type or "application/octet-stream"
+        cherrypy.response.headers["X-Sendfile"] = final_path + (ENCODINGS[encoding] if encoding is not None else "")
+        return "", final_path
+
+    if manifest is not None:
+        path = final_path + (ENCODINGS[encoding] if encoding is not None else "")
+        size, mtime, _ = manifest.get(os.path.relpath(path, result_path).replace(os.sep, "/"))
+
+        # same as "serve_file" but with size and modification time from the manifest instead of the file system
+        cherrypy.response.headers["Last-Modified"] = httputil.HTTPDate(mtime)
+        cptools.validate_since()
+        try:
+            file = open(path, "rb")
+        except OSError:
+            return None, final_path
+
+        return _serveFileObject(file, content_type, size), final_path
+
+    if encoding is None:
+        return serve_file(final_path), final_path
+
+    return serve_file(final_path + ENCODINGS[encoding], content_type=content_type), final_path
+
+
+def resolveArchiveFile(result_path: str, archive: Optional[zipfile.ZipFile], *args: str):
+    """
+    Tries to resolve a file (part of jUnit report) stored in the ZIP archive of a build (storage mode "archive"). It is
+    found using the central directory and read from the memory-mapped archive without extracting it
+
+    :param result_path: path to ZIP archive of specific build of specific branch
+    :param archive: archive opened by "Archives.get" or None when it could not be opened
+    :param args: additional arguments from URL
     :return: file if found or None AND final path (for debugging)
     """
 
-    final_path = os.path.normpath(os.path.join(result_path, "/".join(args)))
-    if not os.path.exists(final_path) or not os.path.isfile(final_path):
+    name = posixpath.normpath("/".join(args))
+    final_path = f"{result_path}/{name}"
+    if archive is None:
         return None, final_path
 
-    return serve_file(final_path), final_path
+    try:
+        member = archive.getinfo(name)
+        if member.is_dir():
+            return None, final_path
+
+        file = archive.open(member)
+    except (KeyError, ValueError, OSError, zipfile.BadZipFile):
+        return None, final_path
+
+    content_type, _ = mimetypes.guess_type(name)
+
+    # same as "serve_file" but with size and modification time from the central directory
+    cherrypy.response.headers["Last-Modified"] = httputil.HTTPDate(time.mktime(member.date_time + (0, 0, -1)))
+    try:
+        cptools.validate_since()
+    except cherrypy.HTTPRedirect:
+        file.close()
+        raise
+
+    return _serveFileObject(file, content_type, member.file_size), final_path
+
+
+def _serveFileObject(file, content_type: Optional[str], size: int):
+    """
+    Serves a file object of known size (including ranges), "Last-Modified" must already be set and validated. Contrary
+    to "serve_fileobj" the size is not read from the file system, which is not possible for members of ZIP archives.
+
+    NOTE: this is the only place using the internal "_serve_fileobj" of CherryPy (as of 18.8.0, see requirements.txt),
+          it has to be checked when updating CherryPy
+
+    :param file: opened file object, closed by CherryPy when sent
+    :param content_type: (optional) content type of the file
+    :param size: size of the file in bytes
+    :return: file to be sent by CherryPy
+    """
+
+    cherrypy.response.headers["Content-Type"] = content_type or "application/octet-stream"
+    return _serve_fileobj(file, content_type, size)
+
+
+def removeBuildData(path: str):
+    """
+    Removes the data of a build, no matter whether stored as extracted files or as ZIP archive (storage mode "archive")
+
+    :param path: path of the build data without ".zip"
+    """
+
+    shutil.rmtree(path, ignore_errors=True)
+    try:
+        os.remove(f"{path}.zip")
+    except OSError:
+        pass
+
+
+def negotiateEncoding(path: str, exists: Callable[[str], bool] = os.path.isfile) -> Optional[str]:
+    """
+    Chooses the precompressed variant of a file to be served based on the header "Accept-Encoding"
+
+    :param path: file requested
+    :param exists: (optional) checks whether a variant exists, e.g. using the manifest instead of the file system
+    :return: encoding (see "ENCODINGS") or None when no variant exists / is accepted
+    """
+
+    header = cherrypy.request.headers.get("Accept-Encoding")
+    if header is None or len(header) == 0:
+        return None
+
+    accepted: dict[str, float] = {}
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        try:
+            quality = float(params.strip().removeprefix("q=")) if "q=" in params else 1.0
+        except ValueError:
+            quality = 0.0
+        accepted[coding.strip().lower()] = quality
+
+    for encoding, extension in ENCODINGS.items():
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0.0 and exists(path + extension):
+            return encoding
+
+    return None
+
+
+def varyEncoding(path: str, exists: Callable[[str], bool] = os.path.isfile):
+    """
+    Sets the header "Vary" when a precompressed variant of a file exists, no matter whether it is served or not, so
+    shared caches do not serve the compressed response to clients not accepting it (and the other way round)
+
+    :param path: file requested
+    :param exists: (optional) checks whether a variant exists, e.g. using the manifest instead of the file system
+    """
+
+    if any(exists(path + extension) for extension in ENCODINGS.values()):
+        cherrypy.response.headers["Vary"] = "Accept-Encoding"
+
+
+def buildETag(build_path: str, *args: str, encoding: Optional[str] = None) -> Optional[str]:
+    """
+    Creates a strong ETag for a resource of a build that never changes after it was added. Only the file system is
+    used (no database) so it can be checked before anything else is done. The build directory is part of the ETag so a
+    build deleted and added again with the same id gets different ETags
+
+    :param build_path: path of the build data, might not exist
+    :param args: parts identifying the resource (e.g. job, branch, build id and path of file)
+    :param encoding: (optional) content encoding, see "negotiateEncoding"
+    :return: ETag or None when build does not exist
+    """
+
+    try:
+        stat = os.stat(build_path)
+    except OSError:
+        return None
+
+    parts = [str(stat.st_dev), str(stat.st_ino)] + [str(arg) for arg in args]
+    if encoding is not None:
+        parts.append(encoding)
+    return '"' + hashlib.sha1("\0".join(parts).encode("utf-8")).hexdigest() + '"'
+
+
+def manifestETag(manifest: Manifest, *args: str) -> Optional[str]:
+    """
+    Creates a strong ETag for a file of a build using the SHA-1 of the (precompressed) file stored in its manifest, so
+    the file system is not used at all
+
+    :param manifest: manifest of the build
+    :param args: additional arguments from URL
+    :return: ETag or None when file is not part of the build
+    """
+
+    relative_path = manifest.resolve(*args)
+    if relative_path is None:
+        return None
+
+    encoding = negotiateEncoding(os.path.join(manifest.root, relative_path), manifest.exists)
+    info = manifest.get(relative_path + (ENCODINGS[encoding] if encoding is not None else ""))
+
+    return '"' + info[2] + '"'
+
+
+def contentETag(content: str) -> str:
+    """
+    Creates a strong ETag for a response that might change (e.g. JSON on latest build)
+
+    :param content: response body
+    :return: ETag
+    """
+
+    return '"' + hashlib.sha1(content.encode("utf-8")).hexdigest() + '"'
+
+
+def matchesETag(etag: str) -> bool:
+    """
+    Checks whether the client already has the resource (header "If-None-Match")
+
+    :param etag: current ETag of the resource
+    :return: True when resource is not modified, False otherwise
+    """
+
+    header = cherrypy.request.headers.get("If-None-Match")
+    if header is None:
+        return False
+
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+
+    return False
+
+
+def setValidators(etag: str, max_age: Optional[int] = None):
+    """
+    Sets the caching headers of a successful response
+
+    :param etag: ETag of the resource
+    :param max_age: seconds the resource can be reused without asking, never changes ("immutable") if not provided
+    """
+
+    cherrypy.response.headers["ETag"] = etag
+    if max_age is None:
+        cherrypy.response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    else:
+        cherrypy.response.headers["Cache-Control"] = f"public, max-age={max_age}"
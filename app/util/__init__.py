@@ -15,6 +15,15 @@ This software and supporting documentation were developed by
 -> see LICENCE at root of repository
 """
 
+from .Archive import *
+from .Compress import *
+from .Ingest import *
 from .Logging import *
+from .Manifest import *
+from .Objects import *
+from .Retention import *
+from .Settings import *
+from .Trash import *
 from .Upload import *
+from .Usage import *
 from .Utilities import *
@@ -18,7 +18,8 @@ This software and supporting documentation were developed by
 import os
 import cherrypy
 
-from app import MultiProjectJob, SingleProjectJob
+from app import IngestStatus, MultiProjectJob, Reconciler, RetentionScheduler, SingleProjectJob, Statistics
+from app.util import IngestQueue, ParserPool, Precompressor, Reaper, RetentionPolicy, Settings
 
 # ======================================================================================================================
 #   Server-Tools
@@ -71,13 +72,35 @@ rest_config = {
 if __name__ == "__main__":
     # 1) Einbinden der URL-Pfade
     # ==========================
-    cherrypy.tree.mount(MultiProjectJob("REPLACE_ME_1", root_path), "/REPLACE_ME_1", config=rest_config)
-    # ^
-    # add additional multi project jobs here after initializing the databases
-
-    cherrypy.tree.mount(SingleProjectJob("REPLACE_ME_2", root_path), "/REPLACE_ME_2", config=rest_config)
-    # ^
-    # add additional single project jobs here after initializing the databases
+    # Uploads aller Jobs werden von einer gemeinsamen Warteschlange im Hintergrund verarbeitet, die jUnit-XML-Dateien
+    # lesen gemeinsame Prozesse, danach werden die Report-Dateien im Hintergrund komprimiert. Geloeschte Builds werden
+    # gedrosselt im Hintergrund entfernt, je Branch werden die letzten 12 Builds behalten
+    ingest = IngestQueue()
+    parser = ParserPool()
+    precompress = Precompressor()
+    reaper = Reaper()
+    settings = Settings(
+        ingest=ingest, parser=parser, precompress=precompress, reaper=reaper, retention=RetentionPolicy(keep=12)
+    )
+
+    jobs = [
+        MultiProjectJob("REPLACE_ME_1", root_path, settings),
+        # ^
+        # add additional multi project jobs here after initializing the databases
+
+        SingleProjectJob("REPLACE_ME_2", root_path, settings),
+        # ^
+        # add additional single project jobs here after initializing the databases
+    ]
+
+    for job in jobs:
+        cherrypy.tree.mount(job, f"/{job.name}", config=rest_config)
+
+    cherrypy.tree.mount(IngestStatus(ingest), "/ingest", config=rest_config)
+    cherrypy.tree.mount(Statistics(jobs, ingest, precompress, reaper), "/statistics", config=rest_config)
+    cherrypy.tree.mount(Reconciler(jobs), "/reconcile", config=rest_config)
+
+    retention = RetentionScheduler(jobs)
 
     # 2) Erweiterte Konfiguration
     # ===========================
@@ -89,6 +112,18 @@ if __name__ == "__main__":
         "server.socket_host": "0.0.0.0"
     })
 
+    # Uploads und Aufbewahrung werden vor allem anderen beendet (niedrigere Prioritaet), da sie Prozesse, Kompressor,
+    # Reaper und Datenbankverbindungen verwenden. Noch wartende Uploads werden beim naechsten Start erneut eingereiht
+    cherrypy.engine.subscribe("start", ingest.start)
+    cherrypy.engine.subscribe("stop", ingest.stop, priority=10)
+    cherrypy.engine.subscribe("start", retention.start)
+    cherrypy.engine.subscribe("stop", retention.stop, priority=10)
+    cherrypy.engine.subscribe("stop", parser.stop)
+    cherrypy.engine.subscribe("stop", precompress.stop)
+    cherrypy.engine.subscribe("stop", reaper.stop)
+    for job in jobs:
+        cherrypy.engine.subscribe("stop", job.sql.connection.close)
+
     # 3) Server starten
     # =================
     cherrypy.engine.start()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+tests/test_ingest.py
+
+Copyright (C) 2021-2023, VISUS Health IT GmbH
+This software and supporting documentation were developed by
+  VISUS Health IT GmbH
+  Gesundheitscampus-Sued 15
+  D-44801 Bochum, Germany
+  http://www.visus.com
+  mailto:info@visus.com
+
+-> see LICENCE at root of repository
+"""
+
+import threading
+
+import pytest
+
+from app.util.Ingest import IngestQueue, IngestQueueFullException
+
+
+def test_stop_keeps_queued_uploads(tmp_path):
+    """
+    Stopping only finishes the running upload, queued ones stay persisted to be queued again when starting
+    """
+
+    started = threading.Event()
+    release = threading.Event()
+    processed = []
+
+    def task(upload):
+        def run():
+            if upload == 0:
+                started.set()
+                release.wait(5)
+            processed.append(upload)
+            (tmp_path / f"{upload}.zip").unlink()
+            return 201
+        return run
+
+    ingest = IngestQueue(workers=1, size=4)
+    ingest.start()
+
+    tickets = []
+    for upload in range(3):
+        (tmp_path / f"{upload}.zip").write_bytes(b"")
+        tickets.append(ingest.submit("Job", f"/Job/master/{upload}", task(upload)))
+    assert started.wait(5)
+
+    stopping = threading.Thread(target=ingest.stop)
+    stopping.start()
+    release.set()
+    stopping.join(5)
+    assert not stopping.is_alive()
+
+    assert processed == [0]
+    assert tickets[0].status == "done"
+    assert [ticket.status for ticket in tickets[1:]] == ["queued", "queued"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["1.zip", "2.zip"]
+
+    with pytest.raises(IngestQueueFullException):
+        ingest.submit("Job", "/Job/master/3", task(3))
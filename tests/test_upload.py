@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+tests/test_upload.py
+
+Copyright (C) 2021-2023, VISUS Health IT GmbH
+This software and supporting documentation were developed by
+  VISUS Health IT GmbH
+  Gesundheitscampus-Sued 15
+  D-44801 Bochum, Germany
+  http://www.visus.com
+  mailto:info@visus.com
+
+-> see LICENCE at root of repository
+"""
+
+import os
+import zipfile
+
+import pytest
+
+from app.util.Upload import InvalidUploadException, JUnitXMLCollector, selectJUnitFiles, unzipData
+
+
+def _testsuite(tests: int, skipped: int, failures: int) -> str:
+    """
+    Creates the content of a jUnit XML file
+
+    :param tests: number of tests
+    :param skipped: number of skipped tests
+    :param failures: number of failed tests
+    :return: XML
+    """
+
+    return f'<testsuite tests="{tests}" skipped="{skipped}" failures="{failures}"><testcase name="test"/></testsuite>'
+
+
+def _parse(upload: str, path: str, select=None):
+    """
+    Extracts and parses an upload like "SharedLogic.ingest" does
+
+    :param upload: path of ZIP archive
+    :param path: to unzip content to
+    :param select: (optional) "selectJUnitFiles" for storage mode "archive"
+    :return: see "JUnitXMLCollector.results"
+    """
+
+    with JUnitXMLCollector(path, ["p1", "p2"]) as collector:
+        unzipData(upload, path, collector.add, select)
+        return collector.results()
+
+
+def test_storage_modes_count_mixed_case_xml_files(tmp_path):
+    upload = str(tmp_path / "upload.zip")
+    with zipfile.ZipFile(upload, "w") as archive:
+        archive.writestr("projects/p1/index.html", "<html></html>")
+        archive.writestr("projects/p1/test-results/T1.xml", _testsuite(3, 1, 0))
+        archive.writestr("projects/p2/index.html", "<html></html>")
+        archive.writestr("projects/p2/test-results/T2.XML", _testsuite(5, 0, 2))
+        archive.writestr("projects/p2/style.css", "body {}")
+
+    files = _parse(upload, str(tmp_path / "files"))
+    archive = _parse(upload, str(tmp_path / "archive"), selectJUnitFiles)
+
+    assert files == archive
+    assert archive[0] == {"successful": 6, "skipped": 1, "flaky": 0, "failed": 2}
+    assert archive[1]["p2"] == {"successful": 3, "skipped": 0, "flaky": 0, "failed": 2}
+    assert not (tmp_path / "archive" / "projects" / "p2" / "style.css").exists()
+
+
+def test_invalid_uploads_are_rejected(tmp_path):
+    upload = str(tmp_path / "upload.zip")
+    with open(upload, "wb") as file:
+        file.write(b"no ZIP archive")
+
+    with pytest.raises(InvalidUploadException):
+        unzipData(upload, str(tmp_path / "corrupt"))
+    assert not os.path.exists(tmp_path / "corrupt")
+
+    with zipfile.ZipFile(upload, "w") as archive:
+        archive.writestr("projects/p1/test-results/T1.xml", "<testsuite")
+
+    with pytest.raises(InvalidUploadException):
+        _parse(upload, str(tmp_path / "malformed"))
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+tests/test_utilities.py
+
+Copyright (C) 2021-2023, VISUS Health IT GmbH
+This software and supporting documentation were developed by
+  VISUS Health IT GmbH
+  Gesundheitscampus-Sued 15
+  D-44801 Bochum, Germany
+  http://www.visus.com
+  mailto:info@visus.com
+
+-> see LICENCE at root of repository
+"""
+
+import cherrypy
+import gzip
+import os
+
+import pytest
+
+from cherrypy.lib import httputil
+
+from app.util.Manifest import writeManifest
+from app.util.Utilities import resolveFile
+
+
+@pytest.fixture(autouse=True)
+def request_headers(monkeypatch):
+    """
+    Fresh request / response headers for every test, as set by CherryPy (behind the proxy) when serving a request
+
+    :return: request headers
+    """
+
+    headers = httputil.HeaderMap()
+    monkeypatch.setattr(cherrypy.serving.request, "headers", headers)
+    monkeypatch.setattr(cherrypy.serving.response, "headers", httputil.HeaderMap())
+    return headers
+
+
+@pytest.fixture
+def data(tmp_path):
+    """
+    Creates the "data" directory with two builds, the report of the first one precompressed
+
+    :return: path of "data" directory
+    """
+
+    for id in ("1", "2"):
+        build = tmp_path / "data" / "Job" / "master" / id
+        build.mkdir(parents=True)
+        (build / "index.html").write_text(f"<html>{id}</html>")
+    with gzip.open(tmp_path / "data" / "Job" / "master" / "1" / "index.html.gz", "wt") as file:
+        file.write("<html>1</html>")
+
+    return str(tmp_path / "data")
+
+
+@pytest.mark.parametrize("manifest", [False, True])
+def test_x_accel_redirect_uri_is_relative_to_data(data, manifest):
+    build = f"{data}/Job/master/1"
+
+    file, _ = resolveFile(
+        build, "index.html", manifest=writeManifest(build) if manifest else None, offload="X-Accel-Redirect",
+        offload_root=data, offload_prefix="/reports/"
+    )
+
+    assert file == ""
+    assert cherrypy.response.headers["X-Accel-Redirect"] == "/reports/Job/master/1/index.html"
+    assert cherrypy.response.headers["Content-Type"] == "text/html"
+
+
+@pytest.mark.parametrize("manifest", [False, True])
+def test_x_sendfile_path_of_negotiated_variant(data, manifest, request_headers):
+    build = f"{data}/Job/master/1"
+    request_headers["Accept-Encoding"] = "gzip"
+
+    file, final_path = resolveFile(
+        build, "index.html", manifest=writeManifest(build) if manifest else None, offload="X-Sendfile"
+    )
+
+    assert file == ""
+    assert os.path.isabs(cherrypy.response.headers["X-Sendfile"])
+    assert cherrypy.response.headers["X-Sendfile"] == final_path + ".gz"
+    assert os.path.samefile(final_path, f"{build}/index.html")
+    assert cherrypy.response.headers["Content-Encoding"] == "gzip"
+    assert cherrypy.response.headers["Vary"] == "Accept-Encoding"
+
+
+@pytest.mark.parametrize("manifest", [False, True])
+@pytest.mark.parametrize("offload", [None, "X-Accel-Redirect", "X-Sendfile"])
+def test_path_traversal_is_not_found(data, manifest, offload):
+    build = f"{data}/Job/master/1"
+
+    file, _ = resolveFile(
+        build, "..", "2", "index.html", manifest=writeManifest(build) if manifest else None, offload=offload,
+        offload_root=data, offload_prefix="/reports"
+    )
+
+    assert file is None
+    assert "X-Accel-Redirect" not in cherrypy.response.headers
+    assert "X-Sendfile" not in cherrypy.response.headers